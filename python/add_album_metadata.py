@@ -4,11 +4,24 @@ Add Album Metadata
 Adds genres, moods, and top tracks metadata to album mapping
 """
 
-import json
 import os
+import sqlite3
+import sys
+
+from album_enrichment import AlbumEnricher
+from album_store import AlbumStore
+from json_io import read_json, write_json
+
+DEFAULT_MAPPING_FILE = "data/ROOM_playlist_album_image_mapping_ordered.json"
+DEFAULT_GENRES = ["Hip-Hop", "R&B"]
+DEFAULT_MOODS = ["Chill", "Energetic"]
 
 def get_album_metadata():
-    """Define metadata for each album in the ROOM playlist"""
+    """Hand-curated moods and top tracks for the ROOM playlist albums
+    
+    Genres here are only a fallback for albums whose artists have no
+    genres on Spotify; enrichment through the API comes first.
+    """
     
     # Metadata mapping for each album
     album_metadata = {
@@ -295,49 +308,63 @@ def get_album_metadata():
     
     return album_metadata
 
-def add_metadata_to_albums():
-    """Add metadata to the album mapping file"""
+def add_metadata_to_albums(mapping_file=DEFAULT_MAPPING_FILE):
+    """Add metadata to an ordered album mapping file
+    
+    Reads ROOM_playlist_album_image_mapping_ordered.json by default; the
+    extractor's playlist_<name>_album_image_mapping_ordered.json works too.
+    """
     
     print("🎵 Adding Metadata to ROOM Playlist Albums")
     print("=" * 50)
     
     # Load the current album mapping
-    mapping_file = "data/ROOM_playlist_album_image_mapping_ordered.json"
     if not os.path.exists(mapping_file):
         print(f"❌ Album mapping file not found: {mapping_file}")
         return
     
-    with open(mapping_file, 'r') as f:
-        albums = json.load(f)
+    albums = read_json(mapping_file)
     
     # Get metadata mapping
     metadata = get_album_metadata()
     
     print(f"📊 Processing {len(albums)} albums...")
     
+    # Resolve genres through the bulk album/artist endpoints (cached by id)
+    try:
+        enricher = AlbumEnricher(cache_path="data/cache/enrichment_cache.json")
+        enricher.enrich(albums)
+        print(f"🔎 Enriched from Spotify with {enricher.request_count} API requests")
+    except Exception as e:
+        print(f"⚠️  Spotify enrichment unavailable, using curated metadata only: {e}")
+    
     # Add metadata to each album
     for album in albums:
         album_name = album['name']
+        curated = metadata.get(album_name, {})
+        
+        if not album.get('genres'):
+            album['genres'] = curated.get('genres', DEFAULT_GENRES)
+        album['moods'] = curated.get('moods', DEFAULT_MOODS)
+        album['top_tracks'] = curated.get('top_tracks', [album.get('track_name', 'Unknown Track')])
         
-        if album_name in metadata:
-            album['genres'] = metadata[album_name]['genres']
-            album['moods'] = metadata[album_name]['moods']
-            album['top_tracks'] = metadata[album_name]['top_tracks']
+        if curated:
             print(f"✅ Added metadata to: {album_name}")
         else:
-            # Default metadata for albums not in the mapping
-            album['genres'] = ["Hip-Hop", "R&B"]
-            album['moods'] = ["Chill", "Energetic"]
-            album['top_tracks'] = [album.get('track_name', 'Unknown Track')]
-            print(f"⚠️  Using default metadata for: {album_name}")
+            print(f"⚠️  Using default moods for: {album_name}")
     
     # Save the updated mapping
     output_file = "data/ROOM_playlist_album_image_mapping_with_metadata.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(albums, f, indent=2, ensure_ascii=False)
+    write_json(output_file, albums)
     
     print(f"\n✅ Updated album mapping saved to: {output_file}")
     
+    # Index genres and moods in the album store
+    try:
+        AlbumStore("data/music.db").save_album_tags(albums)
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not update the album store: {e}")
+    
     # Show sample of updated data
     print(f"\n📋 Sample Updated Album Data:")
     print("-" * 40)
@@ -354,8 +381,9 @@ def main():
     print("🎵 ROOM Playlist Metadata Addition")
     print("=" * 50)
     
-    # Add metadata to albums
-    updated_albums = add_metadata_to_albums()
+    # Add metadata to albums (optionally from another ordered mapping, e.g. playlist_ROOM_album_image_mapping_ordered.json)
+    mapping_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MAPPING_FILE
+    updated_albums = add_metadata_to_albums(mapping_file)
     
     if updated_albums:
         print(f"\n🎉 Metadata addition complete!")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Album Enrichment
+Resolves album and artist ids through Spotify's bulk endpoints and derives
+genres from artist genres, with an on-disk cache keyed by id
+"""
+
+import os
+
+from atomic_write import file_lock
+from json_io import read_json, write_json
+from request_scheduler import get_default_scheduler
+from spotify_client import get_app_client
+
+# Bulk endpoint limits
+ALBUMS_PER_REQUEST = 20
+ARTISTS_PER_REQUEST = 50
+
+DEFAULT_CACHE_PATH = '../data/cache/enrichment_cache.json'
+
+# Spotify genres are lowercase; these don't title-case cleanly
+GENRE_DISPLAY_NAMES = {
+    'hip hop': 'Hip-Hop',
+    'r&b': 'R&B',
+    'edm': 'EDM',
+    'uk drill': 'UK Drill',
+    'lo-fi': 'Lo-Fi',
+}
+
+
+def format_genre(genre):
+    """Turn a Spotify genre ('alternative hip hop') into a display name"""
+    if genre in GENRE_DISPLAY_NAMES:
+        return GENRE_DISPLAY_NAMES[genre]
+    for raw, display in GENRE_DISPLAY_NAMES.items():
+        genre = genre.replace(raw, display)
+    return ' '.join(word if word[:1].isupper() else word.capitalize() for word in genre.split(' '))
+
+
+def album_id_from(album):
+    """Album id from an extracted album, metadata entry or image mapping entry"""
+    if album.get('id') and not isinstance(album['id'], int):
+        return album['id']
+    url = album.get('spotify_url') or album.get('external_url') or ''
+    if '/album/' in url:
+        return url.split('/album/')[1].split('?')[0]
+    return None
+
+
+class AlbumEnricher:
+    """Batched album/artist lookups with a persistent per-id cache"""
+
+    def __init__(self, sp=None, cache_path=DEFAULT_CACHE_PATH):
+        # Albums and artists are public, so client credentials are enough
+        self.sp = sp or get_app_client()
+        self.scheduler = get_default_scheduler()
+        self.cache_path = cache_path
+        self.cache = self.load_cache()
+        self.request_count = 0
+
+    def load_cache(self):
+        """Load the id-keyed cache from disk"""
+        if os.path.exists(self.cache_path):
+            cache = read_json(self.cache_path)
+            cache.setdefault('albums', {})
+            cache.setdefault('artists', {})
+            return cache
+        return {'albums': {}, 'artists': {}}
+
+    def save_cache(self):
+        """Persist the cache next to the data files
+
+        Entries saved by another run since this one loaded the cache are
+        merged in under the lock rather than overwritten.
+        """
+        with file_lock(self.cache_path):
+            cache = self.load_cache()
+            for kind in ('albums', 'artists'):
+                cache[kind].update(self.cache[kind])
+            self.cache = cache
+            write_json(self.cache_path, self.cache, indent=None)
+
+    def _fetch_missing(self, ids, kind, fetch, batch_size):
+        """Fetch ids not yet cached in batches through a bulk endpoint"""
+        cached = self.cache[kind]
+        missing = [i for i in dict.fromkeys(ids) if i and i not in cached]
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            results = self.scheduler.call(fetch, batch)
+            self.request_count += 1
+            for item_id, item in zip(batch, results[kind]):
+                # Unknown ids come back as null; cache that so we don't ask again
+                cached[item_id] = self._compact(kind, item) if item else None
+        return {i: cached.get(i) for i in ids if i}
+
+    @staticmethod
+    def _compact(kind, item):
+        """Keep only the fields enrichment needs"""
+        if kind == 'albums':
+            return {
+                'name': item['name'],
+                'artist_ids': [a['id'] for a in item['artists']],
+                'genres': item.get('genres', []),
+                'label': item.get('label', ''),
+                'popularity': item.get('popularity', 0),
+                'track_names': [t['name'] for t in item.get('tracks', {}).get('items', [])]
+            }
+        return {
+            'name': item['name'],
+            'genres': item.get('genres', []),
+            'popularity': item.get('popularity', 0)
+        }
+
+    def fetch_albums(self, album_ids):
+        return self._fetch_missing(album_ids, 'albums', self.sp.albums, ALBUMS_PER_REQUEST)
+
+    def fetch_artists(self, artist_ids):
+        return self._fetch_missing(artist_ids, 'artists', self.sp.artists, ARTISTS_PER_REQUEST)
+
+    def enrich(self, albums):
+        """Add 'genres', 'label' and 'album_popularity' to each album in place
+
+        Albums without a resolvable id, or whose artists have no genres, get
+        an empty genre list so callers can apply their own fallback.
+        """
+        album_ids = [album_id_from(album) for album in albums]
+        album_info = self.fetch_albums(album_ids)
+
+        artist_ids = []
+        for info in album_info.values():
+            if info:
+                artist_ids.extend(info['artist_ids'])
+        for album in albums:
+            if album.get('artist_id'):
+                artist_ids.append(album['artist_id'])
+        artist_info = self.fetch_artists(artist_ids)
+
+        for album, album_id in zip(albums, album_ids):
+            info = album_info.get(album_id)
+            ids = info['artist_ids'] if info else [album.get('artist_id')]
+
+            genres = list(info['genres']) if info else []
+            for artist_id in ids:
+                artist = artist_info.get(artist_id)
+                if artist:
+                    genres.extend(artist['genres'])
+
+            album['genres'] = list(dict.fromkeys(format_genre(g) for g in genres))
+            if info:
+                album['label'] = info['label']
+                album['album_popularity'] = info['popularity']
+
+        self.save_cache()
+        return albums
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Album Outputs
+Renders every artifact of an album set (albums JSON/CSV, 3D metadata and the
+playlist-ordered JSON/CSV/metadata/image mapping) in a single pass over the
+in-memory records, then writes the files concurrently
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from atomic_write import atomic_write
+from cover_store import CoverStore
+from json_io import write_json
+
+# Albums included in the 3D visualization
+TOP_ALBUM_COUNT = 40
+
+
+def output_names(prefix, ordered=True):
+    """Artifact -> filename for one album set, e.g. prefix 'playlist_ROOM'"""
+    names = {
+        'albums': f'{prefix}_albums.json',
+        'csv': f'{prefix}_albums.csv',
+        'metadata': f'{prefix}_3d_metadata.json',
+    }
+    if ordered:
+        names.update({
+            'ordered_albums': f'{prefix}_albums_ordered.json',
+            'ordered_csv': f'{prefix}_albums_ordered.csv',
+            'ordered_metadata': f'{prefix}_3d_metadata_ordered.json',
+            'ordered_mapping': f'{prefix}_album_image_mapping_ordered.json',
+        })
+    return names
+
+
+def safe_filename_part(text):
+    return "".join(c for c in text if c.isalnum() or c in (' ', '-', '_')).rstrip()
+
+
+def playlist_order_key(album):
+    """Albums are in playlist order when sorted by their first track's added_at"""
+    return album.tracks[0].get('added_at', '') if album.tracks else ''
+
+
+def csv_row(record):
+    """Flatten one album dict for CSV output"""
+    row = {}
+    for key, value in record.items():
+        if key == 'tracks':
+            row['track_names'] = ', '.join([t['name'] for t in value])
+            # Reuse the aggregate instead of re-walking every track
+            row['avg_track_popularity'] = (
+                record['total_popularity'] / record['track_count'] if record['track_count'] else 0
+            )
+        elif key == 'images':
+            row['image_url'] = value[0]['url'] if value else ''
+        elif key == 'range_scores':
+            for time_range, score in value.items():
+                row[f'{time_range}_score'] = score
+        else:
+            row[key] = value
+    return row
+
+
+def _ordered_csv_row(album, position):
+    return {
+        'playlist_position': position,
+        'id': album.id,
+        'name': album.name,
+        'artist': album.artist,
+        'artist_id': album.artist_id,
+        'release_date': album.release_date,
+        'total_tracks': album.total_tracks,
+        'album_type': album.album_type,
+        'image_url': album.image_url,
+        'external_url': album.external_url,
+        'track_count': album.track_count,
+        'total_popularity': album.total_popularity,
+        'track_names': ', '.join(t.name for t in album.tracks),
+        'avg_track_popularity': album.avg_popularity,
+        'track_name': album.first_track_name
+    }
+
+
+def render_album_outputs(albums, names, metadata_header=None, playlist_name=None, covers=None):
+    """Build the payload of every artifact listed in `names` (see output_names)
+
+    albums are Album records in rank order. The ordered artifacts sort the
+    albums by the added_at of their first track (playlist order), as
+    reorder_playlist_data.py did. The ordered image mapping points at the
+    covers' files in the CoverStore `covers` (None until a cover is
+    downloaded). Returns {filename: payload}; the per-album payloads are
+    generators, so each album's dict only exists while it is being written.
+    """
+    outputs = {}
+    if 'albums' in names:
+        outputs[names['albums']] = (album.to_dict() for album in albums)
+    if 'csv' in names:
+        outputs[names['csv']] = (csv_row(album.to_dict()) for album in albums)
+    if 'metadata' in names:
+        outputs[names['metadata']] = {
+            **(metadata_header or {'extraction_date': datetime.now().isoformat()}),
+            'total_albums': len(albums),
+            'albums': [album.metadata_view(i + 1) for i, album in enumerate(albums[:TOP_ALBUM_COUNT])]
+        }
+
+    if any(key.startswith('ordered_') for key in names):
+        # Sorting is stable, so albums added at the same time keep their rank order
+        order = sorted(range(len(albums)), key=lambda index: playlist_order_key(albums[index]))
+        top = list(enumerate((albums[index] for index in order[:TOP_ALBUM_COUNT]), 1))
+
+        if 'ordered_albums' in names:
+            outputs[names['ordered_albums']] = (
+                {**albums[index].to_dict(), 'playlist_rank': position}
+                for position, index in enumerate(order, 1)
+            )
+        if 'ordered_csv' in names:
+            outputs[names['ordered_csv']] = (
+                _ordered_csv_row(albums[index], position)
+                for position, index in enumerate(order, 1)
+            )
+        if 'ordered_metadata' in names:
+            outputs[names['ordered_metadata']] = {
+                'extraction_date': datetime.now().isoformat(),
+                'playlist_info': {
+                    'name': playlist_name,
+                    'total_albums': len(albums),
+                    'ordered_by': 'playlist_sequence'
+                },
+                'albums': [
+                    album.metadata_view(position, playlist_position=position, track_name=album.first_track_name)
+                    for position, album in top
+                ]
+            }
+        if 'ordered_mapping' in names:
+            covers = covers if covers is not None else CoverStore()
+            outputs[names['ordered_mapping']] = [
+                album.mapping_view(
+                    position,
+                    covers.local_image(album.image_url),
+                    playlist_position=position,
+                    track_name=album.first_track_name
+                )
+                for position, album in top
+            ]
+
+    return outputs
+
+
+def _write_output(filepath, payload):
+    if filepath.endswith('.csv'):
+        rows = list(payload)
+        if rows:
+            with atomic_write(filepath, newline='') as f:
+                pd.DataFrame(rows).to_csv(f, index=False)
+    else:
+        write_json(filepath, payload)
+    return filepath
+
+
+def write_outputs(outputs, data_dir='../data', max_workers=4):
+    """Write {filename: payload} concurrently; .csv payloads are iterables of rows"""
+    os.makedirs(data_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_write_output, os.path.join(data_dir, filename), payload)
+            for filename, payload in outputs.items()
+        ]
+        for future in futures:
+            print(f"Data saved to {future.result()}")
+    return list(outputs)
+
+
+def write_album_outputs(albums, names, metadata_header=None, playlist_name=None,
+                        extra_outputs=None, data_dir='../data', max_workers=4):
+    """Render and write every album artifact in one go; returns the filenames"""
+    outputs = render_album_outputs(albums, names, metadata_header, playlist_name)
+    outputs.update(extra_outputs or {})
+    return write_outputs(outputs, data_dir, max_workers)
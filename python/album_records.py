@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Album Records
+Compact __slots__ record types for albums and tracks, built once by the
+extractors. JSON, CSV, 3D metadata and image mappings are rendered as views
+of these records instead of copying fields into new dicts at every stage.
+"""
+
+import sys
+
+from track_schema import ALBUM_FIELDS, TRACK_FIELDS, get_path
+
+# Marks optional fields that were never set, so views can leave them out
+_UNSET = object()
+
+# Cover width the 3D room's textures need; Spotify also serves 640 and 64 px
+SMALL_IMAGE_SIZE = 256
+
+
+def intern_string(value):
+    """Share one copy of repeated strings (artists, ids, genres, album types)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Track:
+    __slots__ = ('id', 'name', 'popularity', 'duration_ms', 'added_at', 'ranks')
+
+    def __init__(self, name, popularity, duration_ms, id=_UNSET, added_at=_UNSET, ranks=_UNSET):
+        self.id = id
+        self.name = name
+        self.popularity = popularity
+        self.duration_ms = duration_ms
+        self.added_at = intern_string(added_at)
+        self.ranks = ranks
+
+    @classmethod
+    def from_spotify(cls, track, **extra):
+        return cls(**{key: get_path(track, path) for key, path in TRACK_FIELDS.items()}, **extra)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_dict(self):
+        data = {}
+        for key in ('id', 'name', 'popularity', 'duration_ms', 'added_at', 'ranks'):
+            value = getattr(self, key)
+            if value is not _UNSET:
+                data[key] = value
+        return data
+
+    def __getitem__(self, key):
+        value = getattr(self, key, _UNSET) if key in self.__slots__ else _UNSET
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class Album:
+    """One album with its aggregates and the tracks that contributed to them
+
+    Extra keys added by later stages (playlist_positions, playlist_rank,
+    range scores, ...) live in `extra` and are rendered after the core fields.
+    Item access (album['name']) is supported so readers can treat records
+    and loaded JSON dicts alike.
+    """
+
+    __slots__ = (
+        'id', 'name', 'artist', 'artist_id', 'release_date', 'total_tracks',
+        'album_type', 'images', 'external_url', 'track_count', 'total_popularity',
+        'tracks', 'extra'
+    )
+
+    CORE_FIELDS = __slots__[:-1]
+
+    def __init__(self, id, name, artist, artist_id, release_date, total_tracks,
+                 album_type, images, external_url, track_count=0, total_popularity=0,
+                 tracks=None, **extra):
+        self.id = intern_string(id)
+        self.name = name
+        self.artist = intern_string(artist)
+        self.artist_id = intern_string(artist_id)
+        self.release_date = intern_string(release_date)
+        self.total_tracks = total_tracks
+        self.album_type = intern_string(album_type)
+        self.images = tuple(images or ())
+        self.external_url = external_url
+        self.track_count = track_count
+        self.total_popularity = total_popularity
+        self.tracks = tracks if tracks is not None else []
+        self.extra = extra or None
+
+    @classmethod
+    def from_spotify(cls, album, **extra):
+        """Empty album aggregate from a Spotify album object"""
+        return cls(**{key: get_path(album, path) for key, path in ALBUM_FIELDS.items()}, **extra)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a record from its JSON form"""
+        data = dict(data)
+        data['tracks'] = [Track.from_dict(t) for t in data.get('tracks', [])]
+        return cls(**data)
+
+    # Derived values shared by every view
+
+    @property
+    def image_url(self):
+        return self.images[0]['url'] if self.images else ''
+
+    @property
+    def small_image_url(self):
+        """Smallest cover of at least SMALL_IMAGE_SIZE px (Spotify's 300px one)"""
+        sized = [image for image in self.images if (image.get('width') or 0) >= SMALL_IMAGE_SIZE]
+        if not sized:
+            return self.image_url
+        return min(sized, key=lambda image: image['width'])['url']
+
+    @property
+    def avg_popularity(self):
+        return self.total_popularity / self.track_count if self.track_count > 0 else 0
+
+    @property
+    def first_track_name(self):
+        return self.tracks[0].name if self.tracks else ''
+
+    # Dict-style access
+
+    def __getitem__(self, key):
+        if key in self.CORE_FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.CORE_FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in self.CORE_FIELDS or bool(self.extra and key in self.extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    # Views
+
+    def to_dict(self):
+        """Full album record, as written to the *_albums.json files"""
+        data = {key: getattr(self, key) for key in self.CORE_FIELDS}
+        data['images'] = list(self.images)
+        data['tracks'] = [track.to_dict() for track in self.tracks]
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def metadata_view(self, rank, playlist_position=None, **extra):
+        """Entry of the 3D visualization metadata"""
+        view = {'rank': rank}
+        if playlist_position is not None:
+            view['playlist_position'] = playlist_position
+        view.update({
+            'id': self.id,
+            'name': self.name,
+            'artist': self.artist,
+            'release_date': self.release_date,
+            'total_tracks': self.total_tracks,
+            'album_type': self.album_type,
+            'image_url': self.image_url,
+            'small_image_url': self.small_image_url,
+            'spotify_url': self.external_url,
+            'track_count': self.track_count,
+            'total_popularity': self.total_popularity,
+            'avg_popularity': self.avg_popularity
+        })
+        view.update(extra)
+        return view
+
+    def mapping_view(self, rank, local_image, playlist_position=None, **extra):
+        """Entry of an album image mapping"""
+        view = {'rank': rank}
+        if playlist_position is not None:
+            view['playlist_position'] = playlist_position
+        view.update({
+            'artist': self.artist,
+            'name': self.name,
+            'local_image': local_image,
+            'spotify_url': self.external_url,
+            'spotify_image_url': self.image_url,
+            'spotify_small_image_url': self.small_image_url,
+            'track_count': self.track_count,
+            'avg_popularity': self.avg_popularity
+        })
+        view.update(extra)
+        return view
+
+
+def record_to_json(obj):
+    """json.dump(default=...) hook so records serialize as their dict views"""
+    if isinstance(obj, (Album, Track)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
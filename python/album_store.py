@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Album Store
+Embedded SQLite store for albums, tracks, playlists, genres/moods and cover
+images. Extractors write to it in batched transactions; the JSON/CSV
+artifacts can be exported from it, and single albums or cross-playlist
+questions are answered with indexed queries instead of reparsing files.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from album_enrichment import album_id_from
+from album_outputs import (
+    output_names, playlist_order_key, render_album_outputs, safe_filename_part, write_outputs
+)
+from album_records import Album, Track
+
+DEFAULT_DB_PATH = '../data/music.db'
+
+# Rows per executemany call inside a write transaction
+BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS albums (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    artist TEXT,
+    artist_id TEXT,
+    release_date TEXT,
+    total_tracks INTEGER,
+    album_type TEXT,
+    images TEXT,
+    external_url TEXT,
+    label TEXT,
+    album_popularity INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_albums_artist_id ON albums(artist_id);
+
+CREATE TABLE IF NOT EXISTS tracks (
+    id TEXT PRIMARY KEY,
+    album_id TEXT,
+    name TEXT,
+    popularity INTEGER,
+    duration_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_album_id ON tracks(album_id);
+
+CREATE TABLE IF NOT EXISTS playlists (
+    id TEXT PRIMARY KEY,
+    kind TEXT,
+    name TEXT,
+    description TEXT,
+    owner TEXT,
+    total_tracks INTEGER,
+    playlist_url TEXT,
+    snapshot_id TEXT,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS playlist_albums (
+    playlist_id TEXT,
+    album_id TEXT,
+    rank INTEGER,
+    position INTEGER,
+    track_count INTEGER,
+    total_popularity INTEGER,
+    extra TEXT,
+    PRIMARY KEY (playlist_id, album_id)
+);
+CREATE INDEX IF NOT EXISTS idx_playlist_albums_rank ON playlist_albums(playlist_id, rank);
+CREATE INDEX IF NOT EXISTS idx_playlist_albums_position ON playlist_albums(playlist_id, position);
+CREATE INDEX IF NOT EXISTS idx_playlist_albums_album_id ON playlist_albums(album_id);
+
+CREATE TABLE IF NOT EXISTS playlist_tracks (
+    playlist_id TEXT,
+    album_id TEXT,
+    seq INTEGER,
+    track_id TEXT,
+    name TEXT,
+    popularity INTEGER,
+    duration_ms INTEGER,
+    added_at TEXT,
+    ranks TEXT,
+    PRIMARY KEY (playlist_id, album_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_playlist_tracks_track_id ON playlist_tracks(track_id);
+
+CREATE TABLE IF NOT EXISTS album_genres (
+    album_id TEXT,
+    genre TEXT,
+    PRIMARY KEY (album_id, genre)
+);
+CREATE INDEX IF NOT EXISTS idx_album_genres_genre ON album_genres(genre);
+
+CREATE TABLE IF NOT EXISTS album_moods (
+    album_id TEXT,
+    mood TEXT,
+    PRIMARY KEY (album_id, mood)
+);
+CREATE INDEX IF NOT EXISTS idx_album_moods_mood ON album_moods(mood);
+
+CREATE TABLE IF NOT EXISTS images (
+    playlist_id TEXT,
+    album_id TEXT,
+    local_image TEXT,
+    spotify_image_url TEXT,
+    PRIMARY KEY (playlist_id, album_id)
+);
+"""
+
+ALBUM_COLUMNS = ('id', 'name', 'artist', 'artist_id', 'release_date', 'total_tracks',
+                 'album_type', 'images', 'external_url')
+
+
+def _batches(rows, size=BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class AlbumStore:
+    """SQLite-backed album store (one connection, safe to share between threads)"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _write(self, statements):
+        """Run (sql, rows) pairs in one transaction, rows in batches"""
+        with self.lock, self.conn:
+            for sql, rows in statements:
+                for batch in _batches(rows):
+                    self.conn.executemany(sql, batch)
+
+    # Writes
+
+    def save_playlist(self, playlist_info, albums, kind='playlist'):
+        """Replace a playlist's albums and tracks with the given Album records
+
+        albums are in rank order; positions follow the playlist order used
+        by the *_ordered outputs.
+        """
+        playlist_id = playlist_info['id']
+        positions = {
+            index: position for position, index in
+            enumerate(sorted(range(len(albums)), key=lambda i: playlist_order_key(albums[i])), 1)
+        }
+
+        album_rows = []
+        track_rows = []
+        playlist_album_rows = []
+        playlist_track_rows = []
+        for index, album in enumerate(albums):
+            album_rows.append((
+                album.id, album.name, album.artist, album.artist_id, album.release_date,
+                album.total_tracks, album.album_type, json.dumps(list(album.images)), album.external_url
+            ))
+            playlist_album_rows.append((
+                playlist_id, album.id, index + 1, positions[index], album.track_count,
+                album.total_popularity, json.dumps(album.extra) if album.extra else None
+            ))
+            for seq, track in enumerate(album.tracks):
+                track_id = track.get('id')
+                if track_id:
+                    track_rows.append((track_id, album.id, track.name, track.popularity, track.duration_ms))
+                ranks = track.get('ranks')
+                playlist_track_rows.append((
+                    playlist_id, album.id, seq, track_id, track.name, track.popularity,
+                    track.duration_ms, track.get('added_at'), json.dumps(ranks) if ranks else None
+                ))
+
+        playlist_row = (
+            playlist_id, kind, playlist_info.get('name'), playlist_info.get('description'),
+            playlist_info.get('owner'), playlist_info.get('total_tracks'),
+            playlist_info.get('playlist_url'), playlist_info.get('snapshot_id'),
+            datetime.now().isoformat()
+        )
+        self._write([
+            ('DELETE FROM playlist_albums WHERE playlist_id = ?', [(playlist_id,)]),
+            ('DELETE FROM playlist_tracks WHERE playlist_id = ?', [(playlist_id,)]),
+            ('INSERT OR REPLACE INTO playlists VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', [playlist_row]),
+            # Keep the enrichment columns (label, album_popularity) of known albums
+            (f"""INSERT INTO albums ({', '.join(ALBUM_COLUMNS)}) VALUES ({', '.join('?' * len(ALBUM_COLUMNS))})
+                 ON CONFLICT(id) DO UPDATE SET
+                 {', '.join(f'{c} = excluded.{c}' for c in ALBUM_COLUMNS[1:])}""", album_rows),
+            ('INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?)', track_rows),
+            ('INSERT INTO playlist_albums VALUES (?, ?, ?, ?, ?, ?, ?)', playlist_album_rows),
+            ('INSERT INTO playlist_tracks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', playlist_track_rows),
+        ])
+
+    def save_album_tags(self, albums):
+        """Store genres, moods, label and album popularity from enriched albums
+
+        Accepts album dicts or mapping entries; ids are resolved the same way
+        as in album_enrichment.
+        """
+        genre_rows = []
+        mood_rows = []
+        detail_rows = []
+        album_ids = []
+        for album in albums:
+            album_id = album_id_from(album)
+            if not album_id:
+                continue
+            album_ids.append((album_id,))
+            genre_rows.extend((album_id, genre) for genre in album.get('genres', []))
+            mood_rows.extend((album_id, mood) for mood in album.get('moods', []))
+            if 'label' in album or 'album_popularity' in album:
+                detail_rows.append((album.get('label'), album.get('album_popularity'), album_id))
+
+        self._write([
+            ('DELETE FROM album_genres WHERE album_id = ?', album_ids),
+            ('DELETE FROM album_moods WHERE album_id = ?', album_ids),
+            ('INSERT OR IGNORE INTO album_genres VALUES (?, ?)', genre_rows),
+            ('INSERT OR IGNORE INTO album_moods VALUES (?, ?)', mood_rows),
+            ('UPDATE albums SET label = ?, album_popularity = ? WHERE id = ?', detail_rows),
+        ])
+
+    def save_images(self, playlist_id, mapping):
+        """Store local cover paths from an album image mapping"""
+        rows = []
+        for entry in mapping:
+            album_id = album_id_from(entry)
+            if album_id:
+                rows.append((playlist_id, album_id, entry.get('local_image'), entry.get('spotify_image_url')))
+        self._write([('INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?)', rows)])
+
+    # Reads
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def get_album(self, album_id):
+        """One album with its genres, moods and the playlists it appears in"""
+        rows = self._query('SELECT * FROM albums WHERE id = ?', (album_id,))
+        if not rows:
+            return None
+        album = rows[0]
+        album['images'] = json.loads(album['images'] or '[]')
+        album['genres'] = [r['genre'] for r in self._query(
+            'SELECT genre FROM album_genres WHERE album_id = ?', (album_id,))]
+        album['moods'] = [r['mood'] for r in self._query(
+            'SELECT mood FROM album_moods WHERE album_id = ?', (album_id,))]
+        album['playlists'] = self.playlists_with_album(album_id)
+        return album
+
+    def albums_by_artist(self, artist_id):
+        return self._query('SELECT * FROM albums WHERE artist_id = ? ORDER BY release_date', (artist_id,))
+
+    def albums_with_genre(self, genre):
+        return self._query(
+            'SELECT a.* FROM album_genres g JOIN albums a ON a.id = g.album_id WHERE g.genre = ? ORDER BY a.name',
+            (genre,))
+
+    def albums_with_mood(self, mood):
+        return self._query(
+            'SELECT a.* FROM album_moods m JOIN albums a ON a.id = m.album_id WHERE m.mood = ? ORDER BY a.name',
+            (mood,))
+
+    def playlists_with_album(self, album_id):
+        """Every playlist containing an album, with its rank and position there"""
+        return self._query(
+            """SELECT p.id, p.name, pa.rank, pa.position, pa.track_count
+               FROM playlist_albums pa JOIN playlists p ON p.id = pa.playlist_id
+               WHERE pa.album_id = ? ORDER BY p.name""",
+            (album_id,))
+
+    def list_playlists(self):
+        return self._query('SELECT * FROM playlists ORDER BY name')
+
+    def playlist_albums(self, playlist_id, order='rank'):
+        """A playlist's albums as Album records, by rank or playlist position"""
+        order_column = 'position' if order == 'position' else 'rank'
+        kind_rows = self._query('SELECT kind FROM playlists WHERE id = ?', (playlist_id,))
+        if not kind_rows:
+            return None
+        with_entries = kind_rows[0]['kind'] == 'playlist'
+
+        tracks = {}
+        for row in self._query(
+                'SELECT * FROM playlist_tracks WHERE playlist_id = ? ORDER BY album_id, seq', (playlist_id,)):
+            if with_entries:
+                track = Track(row['name'], row['popularity'], row['duration_ms'],
+                              id=row['track_id'], added_at=row['added_at'])
+            elif row['ranks']:
+                track = Track(row['name'], row['popularity'], row['duration_ms'], ranks=json.loads(row['ranks']))
+            else:
+                track = Track(row['name'], row['popularity'], row['duration_ms'])
+            tracks.setdefault(row['album_id'], []).append(track)
+
+        albums = []
+        for row in self._query(
+                f"""SELECT a.*, pa.track_count, pa.total_popularity, pa.extra
+                    FROM playlist_albums pa JOIN albums a ON a.id = pa.album_id
+                    WHERE pa.playlist_id = ? ORDER BY pa.{order_column}""",
+                (playlist_id,)):
+            albums.append(Album(
+                **{column: row[column] for column in ALBUM_COLUMNS if column != 'images'},
+                images=json.loads(row['images'] or '[]'),
+                track_count=row['track_count'],
+                total_popularity=row['total_popularity'],
+                tracks=tracks.get(row['id'], []),
+                **json.loads(row['extra'] or '{}')
+            ))
+        return albums
+
+    # Exports
+
+    def export_playlist(self, playlist_id, prefix, data_dir='../data'):
+        """Write the JSON/CSV artifacts of a stored playlist (see album_outputs)"""
+        albums = self.playlist_albums(playlist_id)
+        if albums is None:
+            print(f"❌ Playlist not found in store: {playlist_id}")
+            return None
+        info = self._query('SELECT * FROM playlists WHERE id = ?', (playlist_id,))[0]
+        ordered = info['kind'] == 'playlist'
+        header = {'extraction_date': info['updated_at']}
+        if ordered:
+            header['playlist_info'] = {
+                'id': info['id'],
+                'name': info['name'],
+                'description': info['description'],
+                'owner': info['owner'],
+                'total_tracks': info['total_tracks'],
+                'playlist_url': info['playlist_url'],
+                'snapshot_id': info['snapshot_id']
+            }
+        outputs = render_album_outputs(albums, output_names(prefix, ordered=ordered), header, info['name'])
+        return write_outputs(outputs, data_dir)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store():
+    """Process-wide store at ../data/music.db"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = AlbumStore()
+        return _default_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and export the album store")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help=f"database path (default: {DEFAULT_DB_PATH})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('playlists', help="list stored playlists")
+    album_parser = commands.add_parser('album', help="show one album and where it appears")
+    album_parser.add_argument('album_id')
+    genre_parser = commands.add_parser('genre', help="albums with a genre")
+    genre_parser.add_argument('genre')
+    mood_parser = commands.add_parser('mood', help="albums with a mood")
+    mood_parser.add_argument('mood')
+    export_parser = commands.add_parser('export', help="write a playlist's JSON/CSV files from the store")
+    export_parser.add_argument('playlist_id')
+    export_parser.add_argument('--prefix', help="output file prefix (default: playlist_<name>)")
+    args = parser.parse_args()
+
+    store = AlbumStore(args.db)
+
+    if args.command == 'playlists':
+        for playlist in store.list_playlists():
+            print(f"📋 {playlist['id']}: {playlist['name']} ({playlist['kind']}, updated {playlist['updated_at']})")
+    elif args.command == 'album':
+        album = store.get_album(args.album_id)
+        if not album:
+            print(f"❌ Album not found: {args.album_id}")
+            return
+        print(f"🎵 {album['name']} - {album['artist']} ({album['release_date']})")
+        print(f"   Genres: {', '.join(album['genres']) or '-'}")
+        print(f"   Moods: {', '.join(album['moods']) or '-'}")
+        for playlist in album['playlists']:
+            print(f"   📋 {playlist['name']}: rank {playlist['rank']}, position {playlist['position']}")
+    elif args.command in ('genre', 'mood'):
+        albums = store.albums_with_genre(args.genre) if args.command == 'genre' else store.albums_with_mood(args.mood)
+        for album in albums:
+            print(f"🎵 {album['name']} - {album['artist']}")
+    elif args.command == 'export':
+        playlists = {p['id']: p for p in store.list_playlists()}
+        if args.playlist_id not in playlists:
+            print(f"❌ Playlist not found in store: {args.playlist_id}")
+            return
+        name = playlists[args.playlist_id]['name'] or args.playlist_id
+        prefix = args.prefix or f"playlist_{safe_filename_part(name).replace(' ', '_')}"
+        store.export_playlist(args.playlist_id, prefix)
+
+
+if __name__ == "__main__":
+    main()
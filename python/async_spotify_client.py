@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Async Spotify Client
+asyncio client for the Spotify endpoints used by the extraction pipeline,
+plus async versions of the playlist and top-albums extractors
+"""
+
+import asyncio
+import time
+
+import aiohttp
+from spotipy.exceptions import SpotifyException
+
+from playlist_data_extractor import (
+    PlaylistDataExtractor, parse_playlist_id, playlist_file_stem, shared_playlist_names, write_playlist_outputs
+)
+from request_scheduler import AsyncRequestScheduler
+from spotify_client import get_auth_manager
+from spotify_data_extractor import SpotifyDataExtractor
+from track_schema import (
+    PLAYLIST_INFO_PROJECTION, PLAYLIST_TRACKS_PROJECTION, PLAYLIST_ENTRIES_PROJECTION
+)
+
+API_BASE_URL = 'https://api.spotify.com/v1/'
+
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+DEFAULT_REQUEST_TIMEOUT = 10
+
+
+class AsyncSpotifyClient:
+    """Minimal asyncio Spotify Web API client sharing one keep-alive pool
+
+    Tokens come from the same SpotifyOAuth auth manager (and .cache file)
+    the synchronous scripts use, so no extra login is needed.
+    """
+
+    def __init__(self, auth_manager, scheduler=None,
+                 max_connections=DEFAULT_MAX_CONNECTIONS,
+                 keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+                 request_timeout=DEFAULT_REQUEST_TIMEOUT):
+        self.auth_manager = auth_manager
+        self.scheduler = scheduler or AsyncRequestScheduler(
+            max_concurrency=max_connections,
+            retryable_exceptions=(aiohttp.ClientConnectionError, asyncio.TimeoutError)
+        )
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._session = None
+        self._token_info = None
+        self._token_lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Build a client on the shared auth manager used by the extractors"""
+        return cls(get_auth_manager(), **kwargs)
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _access_token(self, rejected=None):
+        """Current access token, refreshed through the auth manager when expired
+
+        rejected is a token the API answered 401 to; it is refreshed even if
+        it has not expired yet (unless another request already did).
+        """
+        async with self._token_lock:
+            token_info = self._token_info
+            if token_info is None or self.auth_manager.is_token_expired(token_info):
+                # The auth manager reads/writes the token cache with blocking I/O
+                await asyncio.to_thread(self.auth_manager.get_access_token, as_dict=False)
+                token_info = self._token_info = self.auth_manager.cache_handler.get_cached_token()
+            elif rejected is not None and token_info['access_token'] == rejected:
+                await asyncio.to_thread(self.auth_manager.refresh_access_token, token_info['refresh_token'])
+                token_info = self._token_info = self.auth_manager.cache_handler.get_cached_token()
+            return token_info['access_token']
+
+    async def _get(self, path, **params):
+        params = {key: value for key, value in params.items() if value is not None}
+        return await self.scheduler.call(self._request, path, params)
+
+    async def _request(self, path, params):
+        if self._session is None:
+            raise RuntimeError("AsyncSpotifyClient must be used as 'async with' context manager")
+
+        token = await self._access_token()
+        for attempt in range(2):
+            headers = {'Authorization': f'Bearer {token}'}
+            async with self._session.get(API_BASE_URL + path, params=params, headers=headers) as response:
+                if response.status == 401 and attempt == 0:
+                    # Revoked or expired early: refresh once and resend
+                    token = await self._access_token(rejected=token)
+                    continue
+                if response.status >= 400:
+                    try:
+                        message = (await response.json())['error']['message']
+                    except Exception:
+                        message = await response.text()
+                    raise SpotifyException(
+                        response.status, -1,
+                        f"{response.url}:\n {message}",
+                        headers=dict(response.headers)
+                    )
+                return await response.json()
+
+    async def playlist(self, playlist_id, fields=None, market=None):
+        return await self._get(f'playlists/{playlist_id}', fields=fields, market=market)
+
+    async def playlist_tracks(self, playlist_id, fields=None, limit=100, offset=0, market=None):
+        return await self._get(
+            f'playlists/{playlist_id}/tracks',
+            fields=fields, limit=limit, offset=offset, market=market
+        )
+
+    async def current_user_top_tracks(self, limit=20, offset=0, time_range='medium_term'):
+        return await self._get('me/top/tracks', limit=limit, offset=offset, time_range=time_range)
+
+    async def current_user_recently_played(self, limit=50, after=None, before=None):
+        return await self._get('me/player/recently-played', limit=limit, after=after, before=before)
+
+    async def current_user_playlists(self, limit=50, offset=0):
+        return await self._get('me/playlists', limit=limit, offset=offset)
+
+
+class AsyncPlaylistDataExtractor:
+    """PlaylistDataExtractor's API methods as coroutines on an AsyncSpotifyClient
+
+    Only the helpers that never call the API are shared with the sync
+    extractor; the sync API methods (sync_playlist, get_tracks_by_id, ...)
+    are deliberately not available here.
+    """
+
+    _playlist_info = PlaylistDataExtractor._playlist_info
+    entries_from_items = PlaylistDataExtractor.entries_from_items
+    entries_from_albums = PlaylistDataExtractor.entries_from_albums
+    extract_album_data_from_tracks = PlaylistDataExtractor.extract_album_data_from_tracks
+    build_sync_state = PlaylistDataExtractor.build_sync_state
+    load_sync_state = PlaylistDataExtractor.load_sync_state
+    save_to_json = PlaylistDataExtractor.save_to_json
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get_playlist_info(self, playlist_url):
+        """Extract playlist ID from URL and get basic info"""
+        try:
+            playlist_id = parse_playlist_id(playlist_url)
+            playlist = await self.client.playlist(playlist_id, fields=PLAYLIST_INFO_PROJECTION)
+            return self._playlist_info(playlist_id, playlist)
+        except Exception as e:
+            print(f"Error getting playlist info: {e}")
+            return None
+
+    async def get_playlist_tracks(self, playlist_id, limit=None, total=None,
+                                  fields=PLAYLIST_TRACKS_PROJECTION):
+        """Get all tracks from a playlist, fetching pages concurrently (None on failure)"""
+        try:
+            batch_size = 100
+            first_page = await self.client.playlist_tracks(
+                playlist_id, offset=0, limit=batch_size, fields=fields
+            )
+            if total is None:
+                total = first_page['total']
+            if limit:
+                total = min(total, limit)
+
+            # The client's scheduler bounds how many of these run at once
+            pages = await asyncio.gather(*[
+                self.client.playlist_tracks(playlist_id, offset=offset, limit=batch_size, fields=fields)
+                for offset in range(batch_size, total, batch_size)
+            ])
+
+            tracks = list(first_page['items'])
+            for page in pages:
+                tracks.extend(page['items'])
+
+            if limit:
+                tracks = tracks[:limit]
+
+            return tracks
+        except Exception as e:
+            print(f"Error getting playlist tracks: {e}")
+            return None
+
+    async def get_playlist_entries(self, playlist_id, total=None):
+        """Get (track id, added_at) for every playlist item using a minimal projection"""
+        items = await self.get_playlist_tracks(
+            playlist_id,
+            total=total,
+            fields=PLAYLIST_ENTRIES_PROJECTION
+        )
+        if items is None:
+            return None
+
+        return self.entries_from_items(items)
+
+    async def get_user_playlists(self):
+        """Get every playlist of the current user (None on failure)"""
+        try:
+            playlists = []
+            offset = 0
+            while True:
+                page = await self.client.current_user_playlists(limit=50, offset=offset)
+                playlists.extend(page['items'])
+                if not page.get('next'):
+                    return playlists
+                offset += 50
+        except Exception as e:
+            print(f"Error getting user playlists: {e}")
+            return None
+
+
+class AsyncSpotifyDataExtractor:
+    """SpotifyDataExtractor's API methods as coroutines on an AsyncSpotifyClient
+
+    Like AsyncPlaylistDataExtractor, only the offline helpers are shared.
+    """
+
+    albums_from_tracks = SpotifyDataExtractor.albums_from_tracks
+    _new_album_record = SpotifyDataExtractor._new_album_record
+    save_to_json = SpotifyDataExtractor.save_to_json
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get_top_tracks(self, time_range='long_term', limit=50):
+        """Get user's top tracks (None if the request failed)"""
+        try:
+            results = await self.client.current_user_top_tracks(time_range=time_range, limit=limit)
+            return results['items']
+        except Exception as e:
+            print(f"Error getting top tracks: {e}")
+            return None
+
+    async def get_top_albums(self, time_range='long_term', limit=50):
+        """Get user's top albums by analyzing top tracks"""
+        tracks = await self.get_top_tracks(time_range, limit)
+        if tracks is None:
+            return None
+
+        return self.albums_from_tracks(tracks, limit)
+
+    async def get_recently_played(self, limit=50, after=None):
+        """Get recently played tracks, optionally only those played after a
+        unix-millisecond cursor (None if the request failed)"""
+        try:
+            results = await self.client.current_user_recently_played(limit=limit, after=after)
+            return results['items']
+        except Exception as e:
+            print(f"Error getting recently played: {e}")
+            return None
+
+
+async def extract_playlists(playlist_urls):
+    """Extract several playlists concurrently from one event loop
+
+    Each playlist is written like extract_playlist does (always in full:
+    incremental sync needs the sync extractor). Returns {url: albums},
+    with None for the playlists that failed.
+    """
+    async with AsyncSpotifyClient.from_env() as client:
+        extractor = AsyncPlaylistDataExtractor(client)
+
+        # Resolve every playlist first so same-named playlists get distinct filenames
+        infos = await asyncio.gather(*[extractor.get_playlist_info(url) for url in playlist_urls])
+        shared_names = shared_playlist_names(infos)
+
+        async def extract(playlist_url, info):
+            started = time.perf_counter()
+            if info is None:
+                return playlist_url, None
+            tracks = await extractor.get_playlist_tracks(info['id'], total=info['total_tracks'])
+            if tracks is None:
+                return playlist_url, None
+            albums = extractor.extract_album_data_from_tracks(tracks)
+            if not albums:
+                print(f"❌ {info['name']}: no album data extracted")
+                return playlist_url, None
+
+            state = extractor.build_sync_state(info, extractor.entries_from_albums(albums))
+            # File writes block, so they run off the event loop
+            outputs = await asyncio.to_thread(
+                write_playlist_outputs, info, playlist_file_stem(info, shared_names), albums, state
+            )
+            print(f"✅ {info['name']}: {len(albums)} albums, {len(outputs)} files in {time.perf_counter() - started:.1f}s")
+            return playlist_url, albums
+
+        return dict(await asyncio.gather(*[extract(url, info) for url, info in zip(playlist_urls, infos)]))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python async_spotify_client.py <playlist URL or ID> [...]")
+        sys.exit(1)
+
+    results = asyncio.run(extract_playlists(sys.argv[1:]))
+    failed = [url for url, albums in results.items() if albums is None]
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Atomic Write
+Crash-safe file output: data goes to a temp file in the target's directory,
+is fsynced, then renamed over the target. Readers (the frontend, the next
+pipeline stage) see either the old file or the complete new one, never a
+truncated one. file_lock() serializes writers across processes.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking is skipped, writes stay atomic
+    fcntl = None
+
+# Mode for newly created files (NamedTemporaryFile would make them 0600)
+DEFAULT_FILE_MODE = 0o644
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on <path>.lock, held for the with-block"""
+    if fcntl is None:
+        yield
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f'{path}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _fsync_directory(directory):
+    """Persist the rename itself (no-op where directories can't be opened)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8', newline=None, lock=False):
+    """Open a temp file next to `path`; it replaces `path` when the block succeeds
+
+    If the block raises, the temp file is removed and `path` is untouched.
+    With lock=True concurrent writers of the same path take turns.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    with file_lock(path) if lock else _no_lock():
+        binary = 'b' in mode
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, mode, **({} if binary else {'encoding': encoding, 'newline': newline})) as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            _replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+@contextmanager
+def atomic_temp(directory, mode='wb'):
+    """Temp file in `directory` for content whose final name is known only at the end
+
+    Yields (file, commit); commit(path) fsyncs the file and renames it to
+    `path`. Without a commit (or if the block raises) the temp file is removed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    f = os.fdopen(fd, mode)
+
+    def commit(path):
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        _replace(temp_path, path)
+
+    try:
+        yield f, commit
+    finally:
+        f.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _replace(temp_path, path):
+    # Keep the permissions of the file being replaced
+    os.chmod(temp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else DEFAULT_FILE_MODE)
+    os.replace(temp_path, path)
+    _fsync_directory(os.path.dirname(path) or '.')
+
+
+@contextmanager
+def _no_lock():
+    yield
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON
+Compares stdlib json with orjson (when installed) for encoding and decoding
+the files in ../data and synthetic 100k-album outputs, plus the peak memory
+of json_io's streaming writer against building the whole string
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import time
+import tracemalloc
+
+import json_io
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def synthetic_albums(album_count, seed=42):
+    """Album dicts shaped like the 3D metadata / image mapping entries"""
+    rng = random.Random(seed)
+    return [
+        {
+            'rank': i + 1,
+            'id': f'album{i:07d}',
+            'name': f'Album {i} – Édition',
+            'artist': f'Artist {i % (album_count // 3 + 1)}',
+            'release_date': f'{1960 + i % 60}-01-01',
+            'total_tracks': 12,
+            'album_type': 'album',
+            'image_url': f'https://i.scdn.co/image/{i:040d}',
+            'spotify_url': f'https://open.spotify.com/album/album{i:07d}',
+            'track_count': rng.randint(1, 12),
+            'total_popularity': rng.randint(0, 1200),
+            'avg_popularity': round(rng.uniform(0, 100), 2),
+            'genres': rng.sample(['Hip-Hop', 'Jazz', 'Soul', 'R&B', 'Electronic', 'Rock'], 2),
+            'tracks': [
+                {'id': f'track{i:07d}{t}', 'name': f'Track {t}', 'popularity': rng.randint(0, 100),
+                 'duration_ms': rng.randint(90_000, 420_000)}
+                for t in range(3)
+            ]
+        }
+        for i in range(album_count)
+    ]
+
+
+def timed(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+class NullWriter:
+    """Text sink that counts characters instead of keeping them"""
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+
+def stdlib_encode(obj):
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def orjson_encode(obj):
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+
+
+def stream_encode(obj):
+    json_io.dump(obj, NullWriter())
+
+
+def bench(label, obj):
+    text = stdlib_encode(obj)
+    encoded = text.encode('utf-8')
+
+    print(f"\n📄 {label} ({len(encoded):,} bytes)")
+    stdlib_dump, _ = timed(stdlib_encode, obj)
+    stdlib_load, _ = timed(json.loads, encoded)
+    print(f"   json   dumps/loads:     {stdlib_dump * 1000:8.2f} / {stdlib_load * 1000:8.2f} ms")
+    if orjson is not None:
+        fast_dump, fast_text = timed(orjson_encode, obj)
+        fast_load, _ = timed(orjson.loads, encoded)
+        assert json.loads(fast_text) == json.loads(text), "orjson output decodes differently"
+        print(f"   orjson dumps/loads:     {fast_dump * 1000:8.2f} / {fast_load * 1000:8.2f} ms "
+              f"({stdlib_dump / fast_dump:.1f}x / {stdlib_load / fast_load:.1f}x)")
+    stream_dump, _ = timed(stream_encode, obj)
+    assert ''.join(json_io.iter_json(obj)) == text, "streamed output differs from json.dumps"
+    print(f"   json_io.dump ({json_io.BACKEND}):  {stream_dump * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stdlib json vs orjson and the streaming writer")
+    parser.add_argument('--albums', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--data-dir', default='../data')
+    args = parser.parse_args()
+
+    print("⏱️  JSON Benchmark")
+    print("=" * 50)
+    if orjson is None:
+        print("⚠️  orjson is not installed, timing stdlib json only (pip install orjson)")
+
+    for path in sorted(glob.glob(os.path.join(args.data_dir, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            bench(os.path.basename(path), json.load(f))
+
+    for album_count in args.albums:
+        albums = synthetic_albums(album_count)
+        bench(f"synthetic {album_count:,} albums", {'total_albums': album_count, 'albums': albums})
+
+        whole = peak_memory(stdlib_encode, albums)
+        streamed = peak_memory(stream_encode, albums)
+        print(f"   peak memory whole/streamed: {whole / 2**20:8.2f} / {streamed / 2**20:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Build Album Bundle
+Turns the album mapping with metadata into a compact bundle for the frontend:
+minified, with artists/genres/moods as index tables and rows as arrays,
+plus gzip and brotli copies under a content-hash filename. A small manifest
+names the current bundle so it can be cached forever.
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import os
+
+from atomic_write import atomic_write
+import json_io
+from json_io import write_json
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+DEFAULT_INPUT = '../data/ROOM_playlist_album_image_mapping_with_metadata.json'
+DEFAULT_OUTPUT_DIR = '../public/data'
+BUNDLE_NAME = 'album_bundle'
+BUNDLE_VERSION = 1
+
+# Fields whose values (or list items) are stored as indexes into a table
+DICTIONARY_FIELDS = ('artist', 'genres', 'moods')
+
+
+def _common_prefix(values):
+    """Longest prefix ending in '/' shared by every value ('' if none)"""
+    prefix = os.path.commonprefix(values) if values else ''
+    return prefix[:prefix.rfind('/') + 1]
+
+
+def encode_bundle(albums):
+    """Dictionary-encode a list of album dicts"""
+    fields = list(dict.fromkeys(key for album in albums for key in album))
+    tables = {field: [] for field in DICTIONARY_FIELDS if field in fields}
+    indexes = {field: {} for field in tables}
+
+    def index_of(field, value):
+        index = indexes[field].get(value)
+        if index is None:
+            index = indexes[field][value] = len(tables[field])
+            tables[field].append(value)
+        return index
+
+    # URL fields share long prefixes (https://i.scdn.co/image/...); store them once
+    prefixes = {}
+    for field in fields:
+        values = [album.get(field) for album in albums]
+        if values and all(isinstance(v, str) for v in values):
+            prefix = _common_prefix(values)
+            if len(prefix) > 8:
+                prefixes[field] = prefix
+
+    rows = []
+    for album in albums:
+        row = []
+        for field in fields:
+            value = album.get(field)
+            if value is not None and field in tables:
+                if isinstance(value, list):
+                    value = [index_of(field, item) for item in value]
+                else:
+                    value = index_of(field, value)
+            elif value is not None and field in prefixes:
+                value = value[len(prefixes[field]):]
+            row.append(value)
+        rows.append(row)
+
+    return {
+        'v': BUNDLE_VERSION,
+        'fields': fields,
+        'tables': tables,
+        'prefixes': prefixes,
+        'rows': rows
+    }
+
+
+def decode_bundle(bundle):
+    """Inverse of encode_bundle (mirrors decodeAlbumBundle in useAlbumData.js)"""
+    albums = []
+    for row in bundle['rows']:
+        album = {}
+        for field, value in zip(bundle['fields'], row):
+            if value is None:
+                continue
+            table = bundle['tables'].get(field)
+            if table is not None:
+                value = [table[i] for i in value] if isinstance(value, list) else table[value]
+            elif field in bundle['prefixes']:
+                value = bundle['prefixes'][field] + value
+            album[field] = value
+        albums.append(album)
+    return albums
+
+
+def build_album_bundle(input_path=DEFAULT_INPUT, output_dir=DEFAULT_OUTPUT_DIR):
+    """Write <name>.<hash>.json (+ .gz, .br) and <name>.manifest.json"""
+    if not os.path.exists(input_path):
+        print(f"❌ Album mapping not found: {input_path}")
+        return None
+
+    with open(input_path, 'r', encoding='utf-8') as f:
+        raw = f.read()
+    albums = json_io.loads(raw)
+
+    bundle = encode_bundle(albums)
+    # Never publish a bundle the frontend would decode differently
+    if decode_bundle(bundle) != [{k: v for k, v in a.items() if v is not None} for a in albums]:
+        print("❌ Bundle does not round-trip, not writing it")
+        return None
+
+    payload = json_io.dumps(bundle).encode('utf-8')
+    content_hash = hashlib.sha256(payload).hexdigest()[:12]
+    filename = f'{BUNDLE_NAME}.{content_hash}.json'
+
+    os.makedirs(output_dir, exist_ok=True)
+    files = {filename: payload}
+    # mtime=0 keeps the gzip bytes reproducible for the same content
+    files[f'{filename}.gz'] = gzip.compress(payload, compresslevel=9, mtime=0)
+    if brotli is not None:
+        files[f'{filename}.br'] = brotli.compress(payload, quality=11)
+    else:
+        print("⚠️  brotli is not installed, skipping the .br copy (pip install brotli)")
+
+    for name, data in files.items():
+        with atomic_write(os.path.join(output_dir, name), 'wb') as f:
+            f.write(data)
+
+    # Drop bundles from earlier builds
+    for path in glob.glob(os.path.join(output_dir, f'{BUNDLE_NAME}.*.json*')):
+        if os.path.basename(path) not in files:
+            os.remove(path)
+
+    manifest = {
+        'bundle': filename,
+        'hash': content_hash,
+        'albums': len(albums),
+        'sizes': {
+            'source': len(raw.encode('utf-8')),
+            **{name[len(filename) + 1:] or 'json': len(data) for name, data in files.items()}
+        }
+    }
+    manifest_path = os.path.join(output_dir, f'{BUNDLE_NAME}.manifest.json')
+    # Written last, so it never names a bundle that isn't on disk yet
+    write_json(manifest_path, manifest)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the compact album bundle for the frontend")
+    parser.add_argument('--input', default=DEFAULT_INPUT, help=f"album mapping with metadata (default: {DEFAULT_INPUT})")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help=f"where to write the bundle (default: {DEFAULT_OUTPUT_DIR})")
+    args = parser.parse_args()
+
+    print("📦 Building Album Bundle")
+    print("=" * 40)
+
+    manifest = build_album_bundle(args.input, args.output_dir)
+    if not manifest:
+        return
+
+    sizes = manifest['sizes']
+    print(f"✅ {manifest['albums']} albums → {manifest['bundle']}")
+    print(f"   Source:   {sizes['source']:>7,} bytes")
+    for kind in ('json', 'gz', 'br'):
+        if kind in sizes:
+            print(f"   {kind + ':':<9} {sizes[kind]:>7,} bytes ({sizes[kind] / sizes['source']:.0%})")
+    print(f"📋 Manifest: {os.path.join(args.output_dir, BUNDLE_NAME + '.manifest.json')}")
+
+
+if __name__ == "__main__":
+    main()
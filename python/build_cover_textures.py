@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Build Cover Textures
+Level-of-detail copies of every stored cover for the 3D music room: 64, 128,
+256 and 512 px in WebP and JPEG, built in a process pool across all cores.
+Covers Pillow cannot decode are removed from the cover store (so the next
+download fetches them again). The texture paths are recorded in the cover
+manifest and in the album mappings, where useAlbumData picks a small one.
+Requires Pillow (pip install pillow); without it the stage is skipped.
+"""
+
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from atomic_write import atomic_write
+from cover_store import TEXTURE_DIR, URL_PREFIX, CoverStore
+from json_io import read_json, write_json
+
+try:
+    from PIL import Image, UnidentifiedImageError
+except ImportError:  # optional dependency
+    Image = UnidentifiedImageError = None
+
+TEXTURE_SIZES = (64, 128, 256, 512)
+# Pillow format name -> extension and save options
+TEXTURE_FORMATS = {
+    'webp': ('.webp', {'format': 'WEBP', 'quality': 80, 'method': 6}),
+    'jpeg': ('.jpg', {'format': 'JPEG', 'quality': 85, 'optimize': True, 'progressive': True}),
+}
+DEFAULT_MAPPINGS = '../data/*album_image_mapping*.json'
+
+
+def texture_filename(filename, size, fmt):
+    stem = os.path.splitext(filename)[0]
+    return f'{TEXTURE_DIR}/{stem}_{size}{TEXTURE_FORMATS[fmt][0]}'
+
+
+def _decode(f):
+    """Fully decoded RGB image, or raise if Pillow cannot read the file"""
+    # verify() catches corrupt files cheaply but leaves the image unusable
+    with Image.open(f) as image:
+        image.verify()
+    f.seek(0)
+    image = Image.open(f)
+    image.load()
+    return image if image.mode == 'RGB' else image.convert('RGB')
+
+
+def build_textures(source_path, albums_dir, filename, sizes=TEXTURE_SIZES):
+    """Resize one cover (runs in a worker process)
+
+    Returns ({size: {format: path}}, None), or (None, reason) when Pillow
+    cannot decode the cover. Sizes above the original are skipped. Any other
+    error (reading the source, writing textures) is raised.
+    """
+    with open(source_path, 'rb') as f:
+        try:
+            image = _decode(f)
+        except (UnidentifiedImageError, SyntaxError, OSError, ValueError, Image.DecompressionBombError) as e:
+            # The file itself opened fine, so these come from the image data
+            return None, str(e)
+
+    with image:
+        largest = max(image.size)
+        textures = {}
+        for size in sizes:
+            if size > largest:
+                continue
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            textures[str(size)] = {}
+            for fmt, (_, options) in TEXTURE_FORMATS.items():
+                name = texture_filename(filename, size, fmt)
+                with atomic_write(os.path.join(albums_dir, name), 'wb') as out:
+                    resized.save(out, **options)
+                textures[str(size)][fmt] = f'{URL_PREFIX}{name}'
+    return textures, None
+
+
+def _textures_exist(albums_dir, textures):
+    return all(
+        os.path.exists(os.path.join(albums_dir, path[len(URL_PREFIX):]))
+        for formats in textures.values() for path in formats.values()
+    )
+
+
+def build_cover_textures(store=None, workers=None, force=False):
+    """Build missing textures for every stored cover; returns (built, reused, rejected, failed)"""
+    if Image is None:
+        print("⚠️  Pillow is not installed, skipping cover textures (pip install pillow)")
+        return None
+
+    store = store or CoverStore()
+    os.makedirs(os.path.join(store.albums_dir, TEXTURE_DIR), exist_ok=True)
+
+    existing = {}
+    for entry in store.entries.values():
+        if entry.get('textures'):
+            existing.setdefault(entry['file'], entry['textures'])
+
+    pending = []
+    reused = 0
+    for filename in store.files():
+        textures = existing.get(filename)
+        if textures and not force and _textures_exist(store.albums_dir, textures):
+            # Also fills in URLs that were deduplicated onto this file
+            store.set_textures(filename, textures)
+            reused += 1
+        else:
+            pending.append(filename)
+
+    built = rejected = failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(build_textures, store.path(filename), store.albums_dir, filename): filename
+                for filename in pending
+            }
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    textures, reason = future.result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. killed for memory): every pending cover fails, none is at fault
+                    raise
+                except Exception as e:
+                    # Disk full, permissions...: keep the cover and try again next run
+                    failed += 1
+                    print(f"   ⚠️  {filename}: {e}")
+                    continue
+                if textures is None:
+                    # Undecodable: drop it so the downloader fetches a fresh copy
+                    store.forget(filename)
+                    rejected += 1
+                    print(f"   ❌ {filename}: {reason}")
+                else:
+                    store.set_textures(filename, textures)
+                    built += 1
+    finally:
+        store.save()
+    return built, reused, rejected, failed
+
+
+def _existing_image(store, local_image):
+    """local_image if its file is still on disk (rejected covers are gone)"""
+    if local_image and os.path.exists(os.path.join(store.albums_dir, local_image[len(URL_PREFIX):])):
+        return local_image
+    return None
+
+
+def record_textures(mapping_paths, store):
+    """Point each album in the mapping files at its stored cover and texture paths"""
+    updated = 0
+    for path in mapping_paths:
+        albums = read_json(path)
+        changed = False
+        for album in albums:
+            url = album.get('spotify_image_url')
+            local_image = store.local_image(url) or _existing_image(store, album.get('local_image'))
+            if album.get('local_image') != local_image:
+                album['local_image'] = local_image
+                changed = True
+            textures = store.textures(url)
+            if album.get('textures') != textures:
+                if textures:
+                    album['textures'] = textures
+                    changed = True
+                elif 'textures' in album:
+                    del album['textures']
+                    changed = True
+        if changed:
+            write_json(path, albums)
+            updated += 1
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build level-of-detail textures for the stored album covers")
+    parser.add_argument('--mappings', nargs='+', help=f"album mappings to record the textures in (default: {DEFAULT_MAPPINGS})")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    parser.add_argument('--force', action='store_true', help="rebuild textures that already exist")
+    args = parser.parse_args()
+
+    print("🧩 Building Cover Textures")
+    print("=" * 40)
+
+    store = CoverStore()
+    result = build_cover_textures(store, args.workers, args.force)
+    if result is None:
+        return
+    built, reused, rejected, failed = result
+    print(f"✅ Built textures for {built} covers, {reused} already up to date")
+    if rejected:
+        print(f"❌ Rejected {rejected} undecodable covers (removed from the store)")
+    if failed:
+        print(f"⚠️  {failed} covers failed and were kept for the next run")
+
+    mapping_paths = args.mappings or sorted(glob.glob(DEFAULT_MAPPINGS))
+    mapping_paths = [path for path in mapping_paths if os.path.exists(path)]
+    updated = record_textures(mapping_paths, store)
+    print(f"📋 Recorded texture paths in {updated} of {len(mapping_paths)} album mappings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Cover Downloader
+Concurrent album cover downloads for the download scripts: a bounded thread
+pool on the shared keep-alive session, a per-host concurrency limit so one
+CDN never gets more than a few requests at once, and throughput reporting.
+
+Responses are streamed in chunks to a temp file in the store, hashed as
+they arrive and renamed once complete, so memory per download stays
+constant; non-image content types and bodies over MAX_COVER_BYTES are
+rejected.
+
+Covers go into the content-addressed CoverStore. A URL already in its
+manifest is not fetched again (nor is the same URL twice in one run); once
+an entry is older than REVALIDATE_AFTER it is revalidated with a conditional
+request, and a 304 counts as a hit.
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+from atomic_write import atomic_temp
+from cover_store import CoverStore
+from spotify_client import POOL_MAXSIZE, connection_stats, get_session
+
+DEFAULT_MAX_WORKERS = 8
+# Requests in flight per host; i.scdn.co serves every cover
+DEFAULT_PER_HOST = 6
+DEFAULT_TIMEOUT = 10
+
+# Spotify's 640px covers are 50-300 KiB; anything far bigger is not a cover
+MAX_COVER_BYTES = 4 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Accepted Content-Types and the extension they are stored with
+IMAGE_TYPES = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/webp': '.webp'}
+
+# Spotify cover URLs change when the image does, so revalidation is a rare safety net
+REVALIDATE_AFTER = timedelta(days=30)
+
+
+class CoverRejectedError(Exception):
+    """Raised when a response is not an acceptable cover image"""
+
+
+class CoverJob:
+    __slots__ = ('url', 'label')
+
+    def __init__(self, url, label):
+        self.url = url
+        self.label = label
+
+
+class CoverDownloader:
+    """Downloads CoverJobs concurrently; one instance can serve several playlists"""
+
+    def __init__(self, session=None, max_workers=DEFAULT_MAX_WORKERS, per_host=DEFAULT_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT, store=None, revalidate_after=REVALIDATE_AFTER,
+                 max_bytes=MAX_COVER_BYTES):
+        self.session = session or get_session()
+        self.max_workers = max_workers
+        # More than the pool holds per host would only queue inside urllib3
+        self.per_host = min(per_host, POOL_MAXSIZE)
+        self.timeout = timeout
+        self.store = store if store is not None else CoverStore()
+        self.revalidate_after = revalidate_after
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._host_slots = {}
+
+        # Counters for reporting
+        self.downloaded = 0
+        self.hits = 0
+        self.not_modified = 0
+        self.deduplicated = 0
+        self.failed = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.pruned = None
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _conditional_headers(self, entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def fetch(self, url):
+        """Store the cover at url unless the manifest says it is current
+
+        Returns (status, bytes received): 'cached', 'not modified',
+        'deduplicated' (new URL, image already stored) or 'downloaded'.
+        """
+        entry = self.store.get(url)
+        headers = {}
+        if entry and self.store.check(url) is None:
+            checked_at = datetime.fromisoformat(entry['checked_at'])
+            if datetime.now() - checked_at < self.revalidate_after:
+                return 'cached', 0
+            headers = self._conditional_headers(entry)
+
+        # The slot is held for the whole transfer, not just until the headers arrive
+        with self._host_slot(url), \
+                self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and headers:
+                self.store.touch(url)
+                return 'not modified', 0
+            response.raise_for_status()
+            extension = self._check_response(response)
+            status, size, sha256, filename = self._stream_to_store(response, extension)
+        self.store.record(url, response.headers, size, sha256, filename)
+        return status, size
+
+    def _check_response(self, response):
+        """Reject what isn't a cover before reading the body; returns the file extension"""
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in IMAGE_TYPES:
+            raise CoverRejectedError(f"unexpected Content-Type {content_type or 'missing'}")
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            raise CoverRejectedError(f"{int(length):,} bytes is over the {self.max_bytes:,} byte limit")
+        return IMAGE_TYPES[content_type]
+
+    def _stream_to_store(self, response, extension):
+        """Write the body chunk by chunk, hashing as it arrives"""
+        digest = hashlib.sha256()
+        size = 0
+        with atomic_temp(self.store.albums_dir) as (f, commit):
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                size += len(chunk)
+                # Content-Length can be missing or wrong, so count what actually arrives
+                if size > self.max_bytes:
+                    raise CoverRejectedError(f"body is over the {self.max_bytes:,} byte limit")
+                digest.update(chunk)
+                f.write(chunk)
+            if not size:
+                raise CoverRejectedError("empty body")
+
+            sha256 = digest.hexdigest()
+            filename = self.store.filename_for(sha256, extension)
+            if self.store.has_content(filename, size):
+                return 'deduplicated', size, sha256, filename
+            commit(self.store.path(filename))
+        return 'downloaded', size, sha256, filename
+
+    def download(self, jobs, log=print):
+        """Run jobs on the pool; returns {url: status}, 'failed' for errors"""
+        results = {}
+        # One fetch per URL, however many playlists share the album
+        labels = {}
+        for job in jobs:
+            labels.setdefault(job.url, job.label)
+        if not labels:
+            return results
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch, url): url for url in labels}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    status, size = future.result()
+                except Exception as e:
+                    results[url] = 'failed'
+                    self.failed += 1
+                    log(f"   ❌ {labels[url]}: {e}")
+                    continue
+                results[url] = status
+                self.bytes += size
+                if status == 'downloaded':
+                    self.downloaded += 1
+                    log(f"   ✅ {labels[url]}")
+                elif status == 'deduplicated':
+                    self.deduplicated += 1
+                else:
+                    self.hits += 1
+                    self.not_modified += status == 'not modified'
+        self.seconds += time.perf_counter() - started
+        self.store.save()
+        return results
+
+    def prune(self):
+        """Delete covers replaced since they were stored (see CoverStore.prune)"""
+        self.pruned = self.store.prune()
+        return self.pruned
+
+    def throughput(self):
+        """(images/s, bytes/s) over the time spent downloading"""
+        if not self.seconds:
+            return 0.0, 0.0
+        return (self.downloaded + self.deduplicated) / self.seconds, self.bytes / self.seconds
+
+    def print_summary(self):
+        images_per_second, bytes_per_second = self.throughput()
+        print(f"   ⚡ {self.downloaded + self.deduplicated} images, {self.bytes / 1024:,.0f} KiB in {self.seconds:.2f}s "
+              f"({images_per_second:.1f} images/s, {bytes_per_second / 1024:,.0f} KiB/s, "
+              f"{self.max_workers} workers, {self.per_host} per host)")
+        print(f"   ⏭️  {self.hits} unchanged covers skipped ({self.not_modified} revalidated with 304)")
+        if self.deduplicated:
+            print(f"   ♻️  {self.deduplicated} new URLs matched an already stored image")
+        files, size = self.store.disk_usage()
+        print(f"   🗄️  Store: {files} covers, {size / 1024:,.0f} KiB in {self.store.albums_dir}")
+        if self.pruned:
+            print(f"   🧹 Pruned {self.pruned[0]} unreferenced files ({self.pruned[1] / 1024:,.0f} KiB)")
+        for host, stats in connection_stats(self.session).items():
+            print(f"   🔌 {host}: {stats['requests']} requests over {stats['connections']} connections")
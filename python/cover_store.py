@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Cover Store
+Content-addressed album covers: every image is stored once in public/albums
+as <sha256 prefix>.jpg (.png/.webp for those types), however many playlists
+(or ranks) use it. The manifest maps each source URL to its stored file
+together with the ETag/Last-Modified, size and hash needed to skip or
+revalidate it. Playlist mappings only point at stored files, so reordering
+never touches an image. prune() deletes stored files (and their textures)
+that no manifest entry references any more.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from atomic_write import file_lock
+from json_io import read_json, write_json
+
+ALBUMS_DIR = '../public/albums'
+MANIFEST_PATH = '../data/cache/cover_manifest.json'
+# Path the frontend loads stored covers from
+URL_PREFIX = '/albums/'
+# Hex digits of the sha256 used in filenames
+HASH_LENGTH = 16
+# Content-addressed names; anything else in albums_dir (legacy album-named
+# files still matched by fix_album_image_paths) is never pruned
+STORED_NAME = re.compile(rf'[0-9a-f]{{{HASH_LENGTH}}}\.(jpg|png|webp)')
+# Subdirectory of albums_dir holding the resized textures
+TEXTURE_DIR = 'lod'
+TEXTURE_NAME = re.compile(rf'([0-9a-f]{{{HASH_LENGTH}}})_\d+\.(jpg|webp)')
+# Newer files may come from a run that has not saved its manifest yet
+PRUNE_GRACE = timedelta(hours=1)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CoverStore:
+    """Stored covers and the manifest of where each source URL ended up"""
+
+    def __init__(self, albums_dir=ALBUMS_DIR, manifest_path=MANIFEST_PATH):
+        self.albums_dir = albums_dir
+        self.manifest_path = manifest_path
+        self.entries = self._load()
+        self._lock = threading.Lock()
+        # Changes since loading, replayed onto the manifest on disk by save()
+        self._changed = set()
+        self._forgotten = {}
+
+    def _load(self):
+        entries = read_json(self.manifest_path) if os.path.exists(self.manifest_path) else {}
+        # Entries without 'file' predate the content-addressed layout
+        return {url: entry for url, entry in entries.items() if 'file' in entry}
+
+    @staticmethod
+    def filename_for(sha256, extension='.jpg'):
+        return f'{sha256[:HASH_LENGTH]}{extension}'
+
+    def path(self, filename):
+        return os.path.join(self.albums_dir, filename)
+
+    def get(self, url):
+        with self._lock:
+            return self.entries.get(url)
+
+    def local_image(self, url):
+        """Frontend path of the stored cover for url (None if not stored)"""
+        entry = self.get(url)
+        return f'{URL_PREFIX}{entry["file"]}' if entry else None
+
+    def has_content(self, filename, size):
+        """True if a stored file already holds this content (another URL, same image)"""
+        path = self.path(filename)
+        return os.path.exists(path) and os.path.getsize(path) == size
+
+    def textures(self, url):
+        """{size: {format: path}} of the cover's resized copies (None until built)"""
+        entry = self.get(url)
+        return entry.get('textures') if entry else None
+
+    def files(self):
+        """Distinct stored filenames"""
+        with self._lock:
+            return sorted({entry['file'] for entry in self.entries.values()})
+
+    def set_textures(self, filename, textures):
+        with self._lock:
+            for url, entry in self.entries.items():
+                if entry['file'] == filename:
+                    entry['textures'] = textures
+                    self._changed.add(url)
+
+    def forget(self, filename):
+        """Drop a stored file and every URL pointing at it, so it is downloaded again"""
+        with self._lock:
+            for url, entry in list(self.entries.items()):
+                if entry['file'] == filename:
+                    del self.entries[url]
+                    self._changed.discard(url)
+                    self._forgotten[url] = filename
+        if os.path.exists(self.path(filename)):
+            os.remove(self.path(filename))
+
+    def record(self, url, headers, size, sha256, filename):
+        with self._lock:
+            previous = self.entries.get(url)
+            self.entries[url] = {
+                'file': filename,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'size': size,
+                'sha256': sha256,
+                'checked_at': datetime.now().isoformat(timespec='seconds')
+            }
+            # Same image as before: its resized copies are still valid
+            if previous and previous['file'] == filename and 'textures' in previous:
+                self.entries[url]['textures'] = previous['textures']
+            self._changed.add(url)
+            self._forgotten.pop(url, None)
+
+    def touch(self, url):
+        """Mark an entry as just revalidated"""
+        with self._lock:
+            self.entries[url]['checked_at'] = datetime.now().isoformat(timespec='seconds')
+            self._changed.add(url)
+
+    def save(self):
+        """Write the manifest, keeping entries another run saved since this one loaded it
+
+        Under the lock the manifest is re-read and only this store's own
+        changes are applied to it.
+        """
+        with file_lock(self.manifest_path), self._lock:
+            entries = self._load()
+            for url, filename in self._forgotten.items():
+                if entries.get(url, {}).get('file') == filename:
+                    del entries[url]
+            for url in self._changed:
+                entries[url] = self.entries[url]
+            write_json(self.manifest_path, entries)
+            self.entries = entries
+            self._changed.clear()
+            self._forgotten.clear()
+
+    def check(self, url, deep=False):
+        """None if the cover for url is stored intact, else what is wrong with it"""
+        entry = self.get(url)
+        if entry is None:
+            return 'not in manifest'
+        path = self.path(entry['file'])
+        if not os.path.exists(path):
+            return 'missing file'
+        if os.path.getsize(path) != entry['size']:
+            return 'size differs from manifest'
+        if deep and file_sha256(path) != entry['sha256']:
+            return 'hash differs from manifest'
+        return None
+
+    def prune(self, grace=PRUNE_GRACE):
+        """Delete stored covers and textures no manifest entry references
+
+        Returns (files removed, bytes freed).
+        """
+        cutoff = time.time() - grace.total_seconds()
+        removed = freed = 0
+        with file_lock(self.manifest_path):
+            # Other runs' saved entries count too, as do this store's unsaved ones
+            referenced = {entry['file'] for entry in self._load().values()} | set(self.files())
+            referenced_hashes = {filename[:HASH_LENGTH] for filename in referenced}
+
+            candidates = [
+                self.path(name) for name in self._listdir(self.albums_dir)
+                if STORED_NAME.fullmatch(name) and name not in referenced
+            ]
+            texture_dir = os.path.join(self.albums_dir, TEXTURE_DIR)
+            for name in self._listdir(texture_dir):
+                match = TEXTURE_NAME.fullmatch(name)
+                if match and match.group(1) not in referenced_hashes:
+                    candidates.append(os.path.join(texture_dir, name))
+            for path in candidates:
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue
+                os.remove(path)
+                removed += 1
+                freed += stat.st_size
+        return removed, freed
+
+    @staticmethod
+    def _listdir(directory):
+        return os.listdir(directory) if os.path.isdir(directory) else []
+
+    def disk_usage(self):
+        """(stored files, bytes) referenced by the manifest"""
+        sizes = {entry['file']: entry['size'] for entry in self.entries.values()}
+        return len(sizes), sum(sizes.values())
@@ -4,11 +4,10 @@ Download Album Covers
 Downloads album cover images from Spotify URLs for use in 3D visualization
 """
 
-import json
 import os
-import requests
-from urllib.parse import urlparse
-import time
+from cover_downloader import CoverDownloader, CoverJob
+from cover_store import CoverStore
+from json_io import read_json, write_json
 
 def download_album_covers():
     """Download album cover images from the extracted data"""
@@ -22,8 +21,7 @@ def download_album_covers():
         print("❌ 3D metadata file not found. Run spotify_data_extractor.py first.")
         return
     
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
+    metadata = read_json(metadata_path)
     
     # Create albums directory
     albums_dir = "../public/albums"
@@ -32,105 +30,77 @@ def download_album_covers():
     print(f"📁 Saving to: {albums_dir}")
     print(f"🎵 Found {len(metadata['albums'])} albums to process")
     
-    downloaded_count = 0
-    failed_count = 0
+    jobs = [
+        CoverJob(album['image_url'], f"[{album['rank']:2d}] {album['artist']} - {album['name']}")
+        for album in metadata['albums']
+    ]
     
-    for album in metadata['albums']:
-        rank = album['rank']
-        artist = album['artist']
-        name = album['name']
-        image_url = album['image_url']
-        
-        # Create a safe filename
-        safe_artist = "".join(c for c in artist if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        filename = f"{rank:02d}_{safe_artist}_{safe_name}.jpg"
-        filename = filename.replace(' ', '_')
-        
-        filepath = os.path.join(albums_dir, filename)
-        
-        print(f"📥 [{rank:2d}] Downloading: {artist} - {name}")
-        
-        try:
-            # Download the image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            
-            # Save the image
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            
-            downloaded_count += 1
-            print(f"   ✅ Saved: {filename}")
-            
-            # Small delay to be respectful to Spotify's servers
-            time.sleep(0.1)
-            
-        except Exception as e:
-            failed_count += 1
-            print(f"   ❌ Failed: {e}")
+    # Concurrent downloads on the pooled keep-alive session shared with the extractors
+    downloader = CoverDownloader()
+    print(f"📥 Downloading {len(jobs)} covers...")
+    results = downloader.download(jobs)
+    
+    statuses = list(results.values())
+    downloaded_count = statuses.count('downloaded')
+    unchanged_count = len(statuses) - downloaded_count - statuses.count('failed')
+    failed_count = statuses.count('failed')
     
     print(f"\n📊 Download Summary:")
     print(f"   ✅ Successfully downloaded: {downloaded_count}")
+    print(f"   ⏭️  Already stored: {unchanged_count}")
     print(f"   ❌ Failed downloads: {failed_count}")
     print(f"   📁 Files saved to: {albums_dir}")
+    downloader.prune()
+    downloader.print_summary()
     
     # Create a mapping file for easy reference
-    create_album_mapping(metadata, albums_dir)
+    create_album_mapping(metadata, albums_dir, downloader.store)
     
     return downloaded_count, failed_count
 
-def create_album_mapping(metadata, albums_dir):
-    """Create a mapping file that links album data to local image files"""
+def create_album_mapping(metadata, albums_dir, store=None):
+    """Create a mapping file that links album data to stored cover files"""
     
+    store = store or CoverStore(albums_dir)
     mapping = []
     
     for album in metadata['albums']:
-        rank = album['rank']
-        artist = album['artist']
-        name = album['name']
-        
-        # Create the same filename logic as above
-        safe_artist = "".join(c for c in artist if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        filename = f"{rank:02d}_{safe_artist}_{safe_name}.jpg"
-        filename = filename.replace(' ', '_')
-        
         mapping.append({
-            "rank": rank,
-            "artist": artist,
-            "name": name,
-            "local_image": f"/albums/{filename}",
+            "rank": album['rank'],
+            "artist": album['artist'],
+            "name": album['name'],
+            "local_image": store.local_image(album['image_url']),
             "spotify_url": album['spotify_url'],
-            "spotify_image_url": album['image_url']
+            "spotify_image_url": album['image_url'],
+            "spotify_small_image_url": album.get('small_image_url', album['image_url'])
         })
     
     # Save mapping to JSON
     mapping_path = "../data/album_image_mapping.json"
-    with open(mapping_path, 'w') as f:
-        json.dump(mapping, f, indent=2)
+    write_json(mapping_path, mapping)
     
     print(f"📋 Album mapping saved to: {mapping_path}")
 
 def verify_downloads():
-    """Verify that all album covers were downloaded successfully"""
+    """Verify that every top album's cover is in the cover store"""
     
-    albums_dir = "../public/albums"
-    if not os.path.exists(albums_dir):
-        print("❌ Albums directory not found")
+    metadata_path = "../data/spotify_3d_metadata.json"
+    if not os.path.exists(metadata_path):
+        print("❌ 3D metadata file not found")
         return
     
-    files = os.listdir(albums_dir)
-    jpg_files = [f for f in files if f.endswith('.jpg')]
+    store = CoverStore()
+    albums = read_json(metadata_path)['albums']
+    missing = [album for album in albums if store.check(album['image_url']) is not None]
     
     print(f"\n🔍 Verification:")
-    print(f"   📁 Directory: {albums_dir}")
-    print(f"   🖼️  Images found: {len(jpg_files)}")
+    print(f"   📁 Directory: {store.albums_dir}")
+    print(f"   🖼️  Covers stored: {len(albums) - len(missing)}/{len(albums)}")
     
-    if len(jpg_files) >= 40:
+    if not missing:
         print("   ✅ All album covers downloaded successfully!")
     else:
-        print(f"   ⚠️  Expected 40 images, found {len(jpg_files)}")
+        print(f"   ⚠️  Missing covers: {', '.join(album['name'] for album in missing[:5])}")
 
 if __name__ == "__main__":
     download_album_covers()
@@ -4,28 +4,70 @@ Download Playlist Album Covers
 Downloads album cover images from playlist data for use in 3D visualization
 """
 
-import json
 import os
-import requests
-from urllib.parse import urlparse
-import time
+import sqlite3
+from album_store import AlbumStore
+from cover_downloader import CoverDownloader, CoverJob
+from cover_store import CoverStore
+from json_io import read_json, write_json
 import glob
 
-def download_playlist_album_covers(playlist_name=None):
-    """Download album cover images from playlist data"""
+METADATA_PATTERN = "../data/playlist_*_3d_metadata.json"
+
+def metadata_stem(metadata_path):
+    """Filename stem the extractor gave a playlist, from playlist_<stem>_3d_metadata.json"""
+    return os.path.basename(metadata_path)[len('playlist_'):-len('_3d_metadata.json')]
+
+def find_playlist_metadata(playlist):
+    """Metadata files for a playlist given as metadata path, filename stem, name or id
+    
+    Several playlists can share a name (their stems then end in _<id>), so a
+    name may match more than one file.
+    """
+    if playlist.endswith('_3d_metadata.json'):
+        return [playlist] if os.path.exists(playlist) else []
+    stem_path = f"../data/playlist_{playlist}_3d_metadata.json"
+    if os.path.exists(stem_path):
+        return [stem_path]
+    
+    matches = []
+    for metadata_path in sorted(glob.glob(METADATA_PATTERN)):
+        try:
+            info = read_json(metadata_path).get('playlist_info', {})
+        except Exception:
+            continue
+        if playlist in (info.get('name'), info.get('id')):
+            matches.append(metadata_path)
+    return matches
+
+def download_playlist_album_covers(playlist=None, downloader=None):
+    """Download album cover images from playlist data
+    
+    playlist is a metadata path, filename stem, name or id (default: the
+    most recent metadata file). Pass one CoverDownloader to share its pool
+    and totals across playlists.
+    """
     
     print("🖼️  Downloading Playlist Album Covers")
     print("=" * 40)
     
     # Find playlist metadata files
-    if playlist_name:
+    if playlist:
         # Use specific playlist
-        safe_name = "".join(c for c in playlist_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_name = safe_name.replace(' ', '_')
-        metadata_path = f"../data/playlist_{safe_name}_3d_metadata.json"
+        metadata_files = find_playlist_metadata(playlist)
+        if not metadata_files:
+            print(f"❌ Playlist metadata file not found for: {playlist}")
+            print("Run playlist_data_extractor.py first to extract playlist data.")
+            return
+        if len(metadata_files) > 1:
+            print(f"❌ Several playlists match '{playlist}', pass one of their metadata files:")
+            for metadata_path in metadata_files:
+                print(f"   - {metadata_path}")
+            return
+        metadata_path = metadata_files[0]
     else:
         # Find all playlist metadata files
-        playlist_files = glob.glob("../data/playlist_*_3d_metadata.json")
+        playlist_files = glob.glob(METADATA_PATTERN)
         if not playlist_files:
             print("❌ No playlist metadata files found. Run playlist_data_extractor.py first.")
             return
@@ -34,13 +76,7 @@ def download_playlist_album_covers(playlist_name=None):
         metadata_path = max(playlist_files, key=os.path.getctime)
         print(f"📁 Using playlist file: {os.path.basename(metadata_path)}")
     
-    if not os.path.exists(metadata_path):
-        print(f"❌ Playlist metadata file not found: {metadata_path}")
-        print("Run playlist_data_extractor.py first to extract playlist data.")
-        return
-    
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
+    metadata = read_json(metadata_path)
     
     # Create albums directory
     albums_dir = "../public/albums"
@@ -50,98 +86,75 @@ def download_playlist_album_covers(playlist_name=None):
     print(f"🎵 Found {len(metadata['albums'])} albums to process")
     print(f"📋 Playlist: {metadata['playlist_info']['name']}")
     
-    downloaded_count = 0
-    failed_count = 0
+    jobs = [
+        CoverJob(album['image_url'], f"[{album['rank']:2d}] {album['artist']} - {album['name']}")
+        for album in metadata['albums']
+    ]
     
-    for album in metadata['albums']:
-        rank = album['rank']
-        artist = album['artist']
-        name = album['name']
-        image_url = album['image_url']
-        
-        # Create a safe filename with playlist prefix
-        playlist_prefix = "playlist"
-        if 'playlist_info' in metadata:
-            playlist_name = metadata['playlist_info']['name']
-            playlist_prefix = "".join(c for c in playlist_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            playlist_prefix = playlist_prefix.replace(' ', '_')[:20]  # Limit length
-        
-        safe_artist = "".join(c for c in artist if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        filename = f"{playlist_prefix}_{rank:02d}_{safe_artist}_{safe_name}.jpg"
-        filename = filename.replace(' ', '_')
-        
-        filepath = os.path.join(albums_dir, filename)
-        
-        print(f"📥 [{rank:2d}] Downloading: {artist} - {name}")
-        
-        try:
-            # Download the image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            
-            # Save the image
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            
-            downloaded_count += 1
-            print(f"   ✅ Saved: {filename}")
-            
-            # Small delay to be respectful to Spotify's servers
-            time.sleep(0.1)
-            
-        except Exception as e:
-            failed_count += 1
-            print(f"   ❌ Failed: {e}")
+    # Concurrent downloads on the pooled keep-alive session shared with the extractors
+    shared = downloader is not None
+    downloader = downloader or CoverDownloader()
+    print(f"📥 Downloading {len(jobs)} covers...")
+    results = downloader.download(jobs)
+    
+    statuses = list(results.values())
+    downloaded_count = statuses.count('downloaded')
+    unchanged_count = len(statuses) - downloaded_count - statuses.count('failed')
+    failed_count = statuses.count('failed')
     
     print(f"\n📊 Download Summary:")
     print(f"   ✅ Successfully downloaded: {downloaded_count}")
+    print(f"   ⏭️  Already stored: {unchanged_count}")
     print(f"   ❌ Failed downloads: {failed_count}")
     print(f"   📁 Files saved to: {albums_dir}")
+    if not shared:
+        downloader.prune()
+        downloader.print_summary()
     
     # Create a mapping file for easy reference
-    create_playlist_album_mapping(metadata, albums_dir, playlist_prefix)
+    # Named with the extractor's stem, so same-named playlists keep separate mappings
+    create_playlist_album_mapping(metadata, albums_dir, metadata_stem(metadata_path), downloader.store)
     
     return downloaded_count, failed_count
 
-def create_playlist_album_mapping(metadata, albums_dir, playlist_prefix):
-    """Create a mapping file that links playlist album data to local image files"""
+def create_playlist_album_mapping(metadata, albums_dir, stem, store=None):
+    """Create a mapping file that links playlist album data to stored cover files"""
     
+    store = store or CoverStore(albums_dir)
     mapping = []
     
     for album in metadata['albums']:
-        rank = album['rank']
-        artist = album['artist']
-        name = album['name']
-        
-        # Create the same filename logic as above
-        safe_artist = "".join(c for c in artist if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        filename = f"{playlist_prefix}_{rank:02d}_{safe_artist}_{safe_name}.jpg"
-        filename = filename.replace(' ', '_')
-        
         mapping.append({
-            "rank": rank,
-            "artist": artist,
-            "name": name,
-            "local_image": f"/albums/{filename}",
+            "rank": album['rank'],
+            "artist": album['artist'],
+            "name": album['name'],
+            # Shared with every other playlist that has this cover (None if it failed)
+            "local_image": store.local_image(album['image_url']),
             "spotify_url": album['spotify_url'],
             "spotify_image_url": album['image_url'],
+            "spotify_small_image_url": album.get('small_image_url', album['image_url']),
             "track_count": album['track_count'],
             "avg_popularity": album['avg_popularity']
         })
     
     # Save mapping to JSON
-    mapping_path = f"../data/{playlist_prefix}_album_image_mapping.json"
-    with open(mapping_path, 'w') as f:
-        json.dump(mapping, f, indent=2)
+    mapping_path = f"../data/playlist_{stem}_album_image_mapping.json"
+    write_json(mapping_path, mapping)
     
     print(f"📋 Playlist album mapping saved to: {mapping_path}")
+    
+    # Record the local cover paths in the album store
+    playlist_id = metadata.get('playlist_info', {}).get('id')
+    if playlist_id:
+        try:
+            AlbumStore().save_images(playlist_id, mapping)
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not update the album store: {e}")
 
 def list_available_playlists():
     """List all available playlist metadata files"""
     
-    playlist_files = glob.glob("../data/playlist_*_3d_metadata.json")
+    playlist_files = sorted(glob.glob(METADATA_PATTERN))
     
     if not playlist_files:
         print("❌ No playlist metadata files found.")
@@ -154,53 +167,65 @@ def list_available_playlists():
     playlists = []
     for i, file_path in enumerate(playlist_files, 1):
         try:
-            with open(file_path, 'r') as f:
-                metadata = json.load(f)
-                playlist_name = metadata['playlist_info']['name']
-                album_count = len(metadata['albums'])
-                playlists.append({
-                    'name': playlist_name,
-                    'file': file_path,
-                    'albums': album_count
-                })
-                print(f"{i}. {playlist_name} ({album_count} albums)")
+            metadata = read_json(file_path)
+            playlist_name = metadata['playlist_info']['name']
+            album_count = len(metadata['albums'])
+            playlists.append({
+                'name': playlist_name,
+                'file': file_path,
+                'albums': album_count
+            })
+            print(f"{i}. {playlist_name} ({album_count} albums)")
         except Exception as e:
             print(f"{i}. Error reading {os.path.basename(file_path)}: {e}")
     
     return playlists
 
-def verify_playlist_downloads(playlist_name=None):
-    """Verify that playlist album covers were downloaded successfully"""
+def verify_playlist_downloads(playlist=None, deep=False):
+    """Verify playlist album covers against the cover manifest
     
-    albums_dir = "../public/albums"
-    if not os.path.exists(albums_dir):
-        print("❌ Albums directory not found")
-        return
+    Every cover the playlist metadata expects must be recorded in the cover
+    store's manifest with a file of the recorded size (and hash, with deep=True).
+    """
     
-    files = os.listdir(albums_dir)
+    store = CoverStore()
     
-    if playlist_name:
-        # Check for specific playlist files
-        safe_name = "".join(c for c in playlist_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_name = safe_name.replace(' ', '_')
-        playlist_files = [f for f in files if f.startswith(f"{safe_name}_") and f.endswith('.jpg')]
-        print(f"\n🔍 Verification for '{playlist_name}':")
-        print(f"   📁 Directory: {albums_dir}")
-        print(f"   🖼️  Images found: {len(playlist_files)}")
+    if playlist:
+        # Check every playlist matching the path, stem, name or id
+        metadata_files = find_playlist_metadata(playlist)
+        print(f"\n🔍 Verification for '{playlist}':")
+        if not metadata_files:
+            print(f"   ❌ Playlist metadata file not found for: {playlist}")
     else:
         # Check for all playlist files
-        playlist_files = [f for f in files if f.startswith(('playlist_', 'Playlist_')) and f.endswith('.jpg')]
-        print(f"\n🔍 Verification:")
-        print(f"   📁 Directory: {albums_dir}")
-        print(f"   🖼️  Playlist images found: {len(playlist_files)}")
+        metadata_files = glob.glob(METADATA_PATTERN)
+        print("\n🔍 Verification:")
+    
+    # Albums shared between playlists are one stored cover, checked once
+    expected = {}
+    for metadata_path in metadata_files:
+        for album in read_json(metadata_path)['albums']:
+            expected.setdefault(album['image_url'], f"{album['artist']} - {album['name']}")
+    
+    problems = {}
+    for url, label in expected.items():
+        problem = store.check(url, deep=deep)
+        if problem:
+            problems[label] = problem
     
-    if playlist_files:
+    print(f"   📁 Directory: {store.albums_dir}")
+    print(f"   🖼️  Covers verified: {len(expected) - len(problems)}/{len(expected)}")
+    
+    if expected and not problems:
         print("   ✅ Playlist album covers downloaded successfully!")
-        print("   📋 Sample files:")
-        for file in playlist_files[:5]:
-            print(f"      - {file}")
-    else:
+    elif not expected:
         print("   ⚠️  No playlist album covers found")
+    else:
+        print("   ⚠️  Covers to download again:")
+        for label, problem in list(problems.items())[:10]:
+            print(f"      - {label}: {problem}")
+    
+    return not problems
 
 def main():
     print("🎵 Playlist Album Cover Downloader")
@@ -214,28 +239,34 @@ def main():
     
     # Ask user which playlist to process
     if len(playlists) == 1:
-        playlist_name = playlists[0]['name']
-        print(f"\n📥 Processing single playlist: {playlist_name}")
+        playlist = playlists[0]['file']
+        print(f"\n📥 Processing single playlist: {playlists[0]['name']}")
     else:
         print(f"\n📥 Which playlist would you like to process?")
-        print("Enter playlist name or 'all' for all playlists: ", end="")
+        print("Enter playlist number, name or 'all' for all playlists: ", end="")
         user_input = input().strip()
         
         if user_input.lower() == 'all':
-            playlist_name = None
+            playlist = None
             print("📥 Processing all playlists...")
+        elif user_input.isdigit() and 1 <= int(user_input) <= len(playlists):
+            playlist = playlists[int(user_input) - 1]['file']
         else:
-            playlist_name = user_input
+            playlist = user_input
     
     # Download album covers
-    if playlist_name:
-        download_playlist_album_covers(playlist_name)
-        verify_playlist_downloads(playlist_name)
+    if playlist:
+        download_playlist_album_covers(playlist)
+        verify_playlist_downloads(playlist)
     else:
-        # Process all playlists
+        # Process all playlists on one downloader, so connections stay warm between them
+        downloader = CoverDownloader()
         for playlist in playlists:
             print(f"\n📥 Processing: {playlist['name']}")
-            download_playlist_album_covers(playlist['name'])
+            download_playlist_album_covers(playlist['file'], downloader)
+        print(f"\n📊 All Playlists:")
+        downloader.prune()
+        downloader.print_summary()
         verify_playlist_downloads()
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+JSON IO
+One serialization layer for every script: orjson when it is installed
+(pip install orjson), the stdlib json module otherwise. Set
+MUSIC_JSON_BACKEND=stdlib to force the fallback.
+
+dump() streams: the top-level container and the arrays directly inside it are
+written element by element, so a 100k-album array (or a generator of albums) never
+has to exist as one string. Output matches json.dump(..., ensure_ascii=False)
+with indent=2, or compact separators with indent=None.
+"""
+
+import json
+import os
+from collections.abc import Iterator
+
+from atomic_write import atomic_write
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if os.environ.get('MUSIC_JSON_BACKEND') == 'stdlib':
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# Container levels written element by element; deeper values (and any object
+# below the top level) are encoded whole by the backend
+STREAM_DEPTH = 2
+
+
+def dumps(obj, indent=None, default=None):
+    """Encode to a str (indent is None or 2 with orjson; anything with stdlib)"""
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+    separators = None if indent else (',', ':')
+    return json.dumps(obj, indent=indent, default=default, ensure_ascii=False, separators=separators)
+
+
+def loads(data):
+    """Decode a str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load(f):
+    return loads(f.read())
+
+
+def _is_array(obj):
+    return isinstance(obj, (list, tuple, Iterator)) and not isinstance(obj, (str, bytes, dict))
+
+
+def iter_json(obj, indent=2, default=None, depth=STREAM_DEPTH, level=0):
+    """Yield the encoding of obj in chunks, one per element of the outer containers"""
+    if depth <= 0 or not (isinstance(obj, dict) and level == 0 or _is_array(obj)):
+        text = dumps(obj, indent=indent, default=default)
+        yield text.replace('\n', '\n' + ' ' * (indent * level)) if indent and level else text
+        return
+
+    if isinstance(obj, dict):
+        opening, closing, entries = '{', '}', obj.items()
+    else:
+        opening, closing, entries = '[', ']', ((None, item) for item in obj)
+    item_separator = ',' + ('\n' + ' ' * (indent * (level + 1)) if indent else '')
+    key_separator = ': ' if indent else ':'
+
+    yield opening
+    empty = True
+    for key, value in entries:
+        yield item_separator[1:] if empty else item_separator
+        empty = False
+        if key is not None:
+            yield json.dumps(key if isinstance(key, str) else str(key), ensure_ascii=False) + key_separator
+        yield from iter_json(value, indent, default, depth - 1, level + 1)
+    if not empty and indent:
+        yield '\n' + ' ' * (indent * level)
+    yield closing
+
+
+def dump(obj, f, indent=2, default=None):
+    """Stream obj to a text file handle"""
+    for chunk in iter_json(obj, indent=indent, default=default):
+        f.write(chunk)
+
+
+def read_json(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def write_json(path, obj, indent=2, default=None, lock=False):
+    """Stream obj to path atomically (see atomic_write)"""
+    with atomic_write(path, lock=lock) as f:
+        dump(obj, f, indent=indent, default=default)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Parquet Export
+Columnar album and track exports for analytics: list columns for track ids
+and names, typed dates/timestamps/integers, written in row groups so large
+libraries stream to disk. Requires pyarrow (pip install pyarrow); without it
+the export is skipped.
+
+Readers can load only the columns they need, e.g.
+    pyarrow.parquet.read_table('playlist_ROOM_albums.parquet', columns=['artist', 'track_count'])
+"""
+
+import os
+from datetime import date, datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = None
+    pq = None
+
+from atomic_write import atomic_write
+from track_schema import TIME_RANGES
+
+# Albums (and their tracks) per Parquet row group
+ROW_GROUP_SIZE = 10_000
+
+
+def parse_release_date(value):
+    """Spotify release dates ('2018', '2018-05', '2018-05-11') as (date, precision)"""
+    if not value:
+        return None, None
+    parts = value.split('-')
+    try:
+        parsed = date(int(parts[0]), int(parts[1]) if len(parts) > 1 else 1, int(parts[2]) if len(parts) > 2 else 1)
+    except ValueError:
+        return None, None
+    return parsed, ('year', 'month', 'day')[len(parts) - 1]
+
+
+def parse_timestamp(value):
+    """ISO-8601 added_at ('2024-01-05T12:00:00Z') as an aware datetime"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def album_schema():
+    return pa.schema([
+        ('id', pa.string()),
+        ('name', pa.string()),
+        ('artist', pa.string()),
+        ('artist_id', pa.string()),
+        ('release_date', pa.date32()),
+        ('release_date_precision', pa.string()),
+        ('total_tracks', pa.int32()),
+        ('album_type', pa.string()),
+        ('image_url', pa.string()),
+        ('external_url', pa.string()),
+        ('rank', pa.int32()),
+        ('track_count', pa.int32()),
+        ('total_popularity', pa.int64()),
+        ('avg_popularity', pa.float64()),
+        ('track_ids', pa.list_(pa.string())),
+        ('track_names', pa.list_(pa.string())),
+        ('blended_score', pa.float64()),
+    ] + [(f'{time_range}_score', pa.float64()) for time_range in TIME_RANGES])
+
+
+def track_schema():
+    return pa.schema([
+        ('album_id', pa.string()),
+        ('album_rank', pa.int32()),
+        ('track_id', pa.string()),
+        ('name', pa.string()),
+        ('popularity', pa.int32()),
+        ('duration_ms', pa.int32()),
+        ('added_at', pa.timestamp('ms', tz='UTC')),
+    ] + [(f'{time_range}_rank', pa.int32()) for time_range in TIME_RANGES])
+
+
+def _album_columns(albums, start):
+    columns = {name: [] for name in album_schema().names}
+    for rank, album in enumerate(albums, start):
+        release_date, precision = parse_release_date(album.release_date)
+        range_scores = album.get('range_scores') or {}
+        columns['id'].append(album.id)
+        columns['name'].append(album.name)
+        columns['artist'].append(album.artist)
+        columns['artist_id'].append(album.artist_id)
+        columns['release_date'].append(release_date)
+        columns['release_date_precision'].append(precision)
+        columns['total_tracks'].append(album.total_tracks)
+        columns['album_type'].append(album.album_type)
+        columns['image_url'].append(album.image_url)
+        columns['external_url'].append(album.external_url)
+        columns['rank'].append(rank)
+        columns['track_count'].append(album.track_count)
+        columns['total_popularity'].append(album.total_popularity)
+        columns['avg_popularity'].append(album.avg_popularity)
+        columns['track_ids'].append([track.get('id') for track in album.tracks])
+        columns['track_names'].append([track.name for track in album.tracks])
+        columns['blended_score'].append(album.get('blended_score'))
+        for time_range in TIME_RANGES:
+            columns[f'{time_range}_score'].append(range_scores.get(time_range))
+    return columns
+
+
+def _track_columns(albums, start):
+    columns = {name: [] for name in track_schema().names}
+    for rank, album in enumerate(albums, start):
+        for track in album.tracks:
+            ranks = track.get('ranks') or {}
+            columns['album_id'].append(album.id)
+            columns['album_rank'].append(rank)
+            columns['track_id'].append(track.get('id'))
+            columns['name'].append(track.name)
+            columns['popularity'].append(track.popularity)
+            columns['duration_ms'].append(track.duration_ms)
+            columns['added_at'].append(parse_timestamp(track.get('added_at')))
+            for time_range in TIME_RANGES:
+                columns[f'{time_range}_rank'].append(ranks.get(time_range))
+    return columns
+
+
+def write_album_parquet(albums, albums_path, tracks_path, row_group_size=ROW_GROUP_SIZE):
+    """Write albums and their tracks to two Parquet files, one row group per chunk
+
+    albums are Album records in rank order. Returns the paths written, or
+    None when pyarrow is not installed.
+    """
+    if pa is None:
+        print("⚠️  pyarrow is not installed, skipping the Parquet export (pip install pyarrow)")
+        return None
+
+    albums_schema = album_schema()
+    tracks_schema = track_schema()
+    # Both files go to temp files that replace the targets only once every
+    # row group is written, so readers never see a half-written footer
+    with atomic_write(albums_path, 'wb') as album_file, atomic_write(tracks_path, 'wb') as track_file:
+        with pq.ParquetWriter(album_file, albums_schema) as album_writer, \
+                pq.ParquetWriter(track_file, tracks_schema) as track_writer:
+            for start in range(0, len(albums), row_group_size):
+                chunk = albums[start:start + row_group_size]
+                album_writer.write_table(pa.table(_album_columns(chunk, start + 1), schema=albums_schema))
+                track_writer.write_table(pa.table(_track_columns(chunk, start + 1), schema=tracks_schema))
+    return [albums_path, tracks_path]
+
+
+def save_to_parquet(albums, filename, data_dir='../data'):
+    """Save albums and their tracks as <data_dir>/<filename>_albums/_tracks.parquet"""
+    os.makedirs(data_dir, exist_ok=True)
+    paths = write_album_parquet(
+        albums,
+        os.path.join(data_dir, f'{filename}_albums.parquet'),
+        os.path.join(data_dir, f'{filename}_tracks.parquet')
+    )
+    for path in paths or []:
+        print(f"Data saved to {path}")
+    return paths
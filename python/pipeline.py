@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Pipeline Runner
+Runs the extract (or legacy reorder) → download → enrich → textures → fix →
+bundle chain as stages with declared inputs and outputs. A stage is skipped
+when the content hash of its inputs (and of its own script) is unchanged
+since its last successful run, and stages whose inputs don't depend on each
+other run in parallel.
+"""
+
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from album_outputs import safe_filename_part
+from atomic_write import file_lock
+from json_io import read_json, write_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PYTHON_DIR = os.path.join(ROOT, 'python')
+STATE_PATH = 'data/cache/pipeline_state.json'
+
+
+class Stage:
+    """One pipeline step run as a subprocess
+
+    inputs/outputs are paths relative to the repo root (files or
+    directories). A stage depends on every stage that outputs one of its
+    inputs. remote stages read from the Spotify API, so they always run
+    when selected and rely on their own change detection.
+    """
+
+    def __init__(self, name, command, inputs=(), outputs=(), cwd=PYTHON_DIR, remote=False, script=None):
+        self.name = name
+        self.command = command
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.cwd = cwd
+        self.remote = remote
+        # Script whose source is part of the stage's cache key
+        self.script = script or os.path.relpath(os.path.join(cwd, command[1]), ROOT)
+
+
+def call(module, function, *args):
+    """Command that runs module.function(*args) from python/"""
+    return [sys.executable, '-c', f'import {module}; {module}.{function}(*{args!r})']
+
+
+def room_stages(playlist_url=None, name='ROOM'):
+    """The ROOM playlist chain, as the scripts are normally run by hand
+
+    The extractor writes the playlist-ordered mapping itself, so enrich
+    reads it directly. The reorder stage only runs for albums extracted
+    before that, which have no ordered mapping next to them.
+    """
+    prefix = f"data/playlist_{safe_filename_part(name).replace(' ', '_')}"
+    ordered_mapping = f'{prefix}_album_image_mapping_ordered.json'
+    stages = []
+    if playlist_url:
+        stages.append(Stage(
+            'extract',
+            [sys.executable, 'playlist_data_extractor.py', playlist_url],
+            outputs=[f'{prefix}_albums.json', f'{prefix}_3d_metadata.json', ordered_mapping],
+            remote=True
+        ))
+    elif not os.path.exists(os.path.join(ROOT, ordered_mapping)):
+        ordered_mapping = 'data/ROOM_playlist_album_image_mapping_ordered.json'
+        stages.append(Stage(
+            'reorder',
+            [sys.executable, 'reorder_playlist_data.py', f'../{prefix}_albums.json'],
+            inputs=[f'{prefix}_albums.json'],
+            outputs=[
+                'data/ROOM_playlist_albums_ordered.json',
+                'data/ROOM_playlist_albums_ordered.csv',
+                'data/ROOM_playlist_3d_metadata_ordered.json',
+                ordered_mapping,
+            ]
+        ))
+    stages += [
+        Stage(
+            'download',
+            call('download_playlist_album_covers', 'download_playlist_album_covers', f'../{prefix}_3d_metadata.json'),
+            inputs=[f'{prefix}_3d_metadata.json'],
+            outputs=['public/albums', 'data/cache/cover_manifest.json', f'{prefix}_album_image_mapping.json'],
+            script='python/download_playlist_album_covers.py'
+        ),
+        Stage(
+            'enrich',
+            [sys.executable, 'python/add_album_metadata.py', ordered_mapping],
+            inputs=[ordered_mapping],
+            outputs=['data/ROOM_playlist_album_image_mapping_with_metadata.json'],
+            cwd=ROOT
+        ),
+        Stage(
+            'textures',
+            [sys.executable, 'build_cover_textures.py',
+             '--mappings', '../data/ROOM_playlist_album_image_mapping_with_metadata.json'],
+            inputs=['data/cache/cover_manifest.json', 'data/ROOM_playlist_album_image_mapping_with_metadata.json'],
+            outputs=['data/cache/cover_manifest.json', 'data/ROOM_playlist_album_image_mapping_with_metadata.json']
+        ),
+        Stage(
+            'fix',
+            [sys.executable, 'scripts/fix_album_image_paths.py'],
+            inputs=['data/ROOM_playlist_album_image_mapping_with_metadata.json', 'data/cache/cover_manifest.json'],
+            outputs=['data/ROOM_playlist_album_image_mapping_with_metadata_fixed.json'],
+            cwd=ROOT
+        ),
+        Stage(
+            'bundle',
+            [sys.executable, 'build_album_bundle.py'],
+            inputs=['data/ROOM_playlist_album_image_mapping_with_metadata.json'],
+            outputs=['public/data/album_bundle.manifest.json']
+        ),
+    ]
+    return stages
+
+
+class Pipeline:
+    def __init__(self, stages, state_path=STATE_PATH):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = os.path.join(ROOT, state_path)
+        self.state = self.load_state()
+        self.deps = self._resolve_deps()
+
+    def load_state(self):
+        if os.path.exists(self.state_path):
+            return read_json(self.state_path)
+        return {'files': {}, 'stages': {}}
+
+    def save_state(self):
+        write_json(self.state_path, self.state)
+
+    def _resolve_deps(self):
+        """Stage -> stages that produce one of its inputs (earlier in the list)"""
+        deps = {}
+        order = list(self.stages)
+        for i, name in enumerate(order):
+            stage = self.stages[name]
+            deps[name] = {
+                other for other in order[:i]
+                if any(_overlaps(path, output) for path in stage.inputs for output in self.stages[other].outputs)
+            }
+        return deps
+
+    def file_hash(self, path):
+        """sha256 of one file; reuses the stored hash while size and mtime match"""
+        stat = os.stat(os.path.join(ROOT, path))
+        cached = self.state['files'].get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(os.path.join(ROOT, path), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        self.state['files'][path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def input_key(self, stage):
+        """Content hash over the stage's script and every input file"""
+        digest = hashlib.sha256()
+        for path in [stage.script] + stage.inputs:
+            for file_path in _walk(path):
+                digest.update(file_path.encode())
+                digest.update(self.file_hash(file_path).encode())
+        return digest.hexdigest()
+
+    def is_fresh(self, stage):
+        if stage.remote:
+            return False
+        if not all(os.path.exists(os.path.join(ROOT, path)) for path in stage.outputs):
+            return False
+        return self.state['stages'].get(stage.name) == self.input_key(stage)
+
+    def run_stage(self, stage):
+        started = time.perf_counter()
+        process = subprocess.run(stage.command, cwd=stage.cwd, capture_output=True, text=True)
+        seconds = round(time.perf_counter() - started, 2)
+        if process.returncode != 0:
+            return 'failed', seconds, (process.stderr or process.stdout).strip().splitlines()[-1:]
+        missing = [path for path in stage.outputs if not os.path.exists(os.path.join(ROOT, path))]
+        if missing:
+            return 'failed', seconds, [f"missing outputs: {', '.join(missing)}"]
+        return 'ran', seconds, []
+
+    def run(self, force=(), dry_run=False, workers=4):
+        """Run every stage whose inputs changed; returns {stage: result}"""
+        results = {}
+        pending = dict(self.deps)
+        running = {}
+
+        def ready(name):
+            return all(dep in results for dep in pending[name])
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                for name in [n for n in pending if ready(n)]:
+                    deps = pending.pop(name)
+                    stage = self.stages[name]
+                    if any(results[dep]['status'] in ('failed', 'blocked') for dep in deps):
+                        results[name] = {'status': 'blocked', 'seconds': 0}
+                    elif any(not os.path.exists(os.path.join(ROOT, path)) for path in stage.inputs):
+                        results[name] = {'status': 'missing inputs', 'seconds': 0}
+                    elif name not in force and self.is_fresh(stage):
+                        results[name] = {'status': 'cached', 'seconds': 0}
+                    elif dry_run:
+                        results[name] = {'status': 'would run', 'seconds': 0}
+                    else:
+                        print(f"▶️  {name}: {' '.join(stage.command[1:])}")
+                        running[executor.submit(self.run_stage, stage)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    status, seconds, error = future.result()
+                    results[name] = {'status': status, 'seconds': seconds}
+                    if error:
+                        results[name]['error'] = error[0]
+                    if status == 'ran':
+                        # Hash after the run: a stage may rewrite its own inputs
+                        self.state['stages'][name] = self.input_key(self.stages[name])
+                    else:
+                        self.state['stages'].pop(name, None)
+
+        if not dry_run:
+            self.save_state()
+        return results
+
+
+def _overlaps(path, other):
+    """True if two repo paths are the same or one contains the other"""
+    return path == other or path.startswith(other + '/') or other.startswith(path + '/')
+
+
+def _walk(path):
+    """Files under a repo path, sorted; a missing path yields nothing"""
+    full = os.path.join(ROOT, path)
+    if os.path.isfile(full):
+        return [path]
+    files = []
+    for directory, _, names in os.walk(full):
+        for name in names:
+            files.append(os.path.relpath(os.path.join(directory, name), ROOT))
+    return sorted(files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the playlist → covers → metadata pipeline")
+    parser.add_argument('--playlist', help="playlist URL or ID to (re-)extract first")
+    parser.add_argument('--name', default='ROOM', help="playlist name used in file names (default: ROOM)")
+    parser.add_argument('--force', nargs='*', default=[], metavar='STAGE',
+                        help="run these stages even if their inputs are unchanged")
+    parser.add_argument('--dry-run', action='store_true', help="only show what would run")
+    parser.add_argument('--workers', type=int, default=4, help="stages to run at once (default: 4)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    # One pipeline at a time: a second run waits rather than racing on the data files
+    with file_lock(os.path.join(ROOT, STATE_PATH)):
+        pipeline = Pipeline(room_stages(args.playlist, args.name))
+        results = pipeline.run(force=set(args.force), dry_run=args.dry_run, workers=args.workers)
+
+    print("\n📊 Pipeline Summary:")
+    print("-" * 50)
+    icons = {'ran': '✅', 'cached': '⏭️ ', 'would run': '▶️ ', 'failed': '❌', 'blocked': '⛔', 'missing inputs': '⚠️ '}
+    for name in pipeline.stages:
+        result = results[name]
+        detail = f" - {result['error']}" if result.get('error') else ''
+        print(f"{icons[result['status']]} {name}: {result['status']} ({result['seconds']}s){detail}")
+    print(f"\n⏱️  Finished in {time.perf_counter() - started:.2f}s")
+
+    if any(result['status'] == 'failed' for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
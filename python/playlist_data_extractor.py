@@ -4,14 +4,76 @@ Spotify Playlist Data Extractor
 Extracts album data from a specific Spotify playlist for 3D visualization
 """
 
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-import pandas as pd
-import json
 import os
-from datetime import datetime
+import sqlite3
+import argparse
+from collections import Counter, deque
+from itertools import islice
 import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from request_scheduler import get_default_scheduler
+from spotify_client import get_spotify_client, connection_stats
+from album_outputs import output_names, write_album_outputs
+from album_records import Album, Track, record_to_json
+from album_store import get_default_store
+from json_io import read_json, write_json
+from parquet_export import save_to_parquet
+from track_schema import (
+    PLAYLIST_INFO_PROJECTION, PLAYLIST_TRACKS_PROJECTION, PLAYLIST_ENTRIES_PROJECTION
+)
+
+def parse_playlist_id(playlist_url):
+    """Extract the playlist ID from a Spotify playlist URL (or return the ID as-is)"""
+    if 'playlist/' in playlist_url:
+        return playlist_url.split('playlist/')[1].split('?')[0]
+    return playlist_url
+
+class AlbumAggregator:
+    """Folds playlist items into Album records one at a time
+    
+    Raw items can be dropped as soon as they are added, so memory grows with
+    the number of albums (plus a slotted Track per track when keep_tracks
+    is set) rather than with the raw API payload. Without keep_tracks each
+    album keeps only its first track, which playlist order is based on.
+    """
+    
+    def __init__(self, album_data=None, keep_tracks=True):
+        self.album_data = album_data if album_data is not None else {}
+        self.keep_tracks = keep_tracks
+        self.item_count = 0
+    
+    def add(self, item):
+        """Fold one playlist item into its album record"""
+        self.item_count += 1
+        track = item['track']
+        if not track:  # Skip null tracks
+            return
+        
+        album = track['album']
+        album_id = album['id']
+        
+        record = self.album_data.get(album_id)
+        if record is None:
+            # playlist_positions: track positions in playlist
+            record = self.album_data[album_id] = Album.from_spotify(album, playlist_positions=[])
+        
+        record.track_count += 1
+        record.total_popularity += track['popularity']
+        if self.keep_tracks or not record.tracks:
+            record.tracks.append(Track.from_spotify(track, added_at=item.get('added_at', '')))
+    
+    def add_page(self, items):
+        for item in items:
+            self.add(item)
+    
+    def albums(self):
+        """Convert to list and sort by track count (most represented albums first)"""
+        albums_list = list(self.album_data.values())
+        albums_list.sort(key=lambda x: (x.track_count, x.total_popularity), reverse=True)
+        
+        return albums_list
 
 class PlaylistDataExtractor:
     def __init__(self):
@@ -23,176 +85,485 @@ class PlaylistDataExtractor:
         self.client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
         self.redirect_uri = os.getenv('SPOTIFY_REDIRECT_URI', 'http://127.0.0.1:3000/callback')
         
-        # Initialize Spotify client with playlist read scope
-        self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-            client_id=self.client_id,
-            client_secret=self.client_secret,
-            redirect_uri=self.redirect_uri,
-            scope='playlist-read-private playlist-read-collaborative'
-        ))
+        # Shared client on the pooled session (see spotify_client.py)
+        self.sp = get_spotify_client()
+        
+        # All API calls go through the shared rate-limit-aware scheduler
+        self.scheduler = get_default_scheduler()
     
     def get_playlist_info(self, playlist_url):
         """Extract playlist ID from URL and get basic info"""
         try:
             # Extract playlist ID from URL
-            if 'playlist/' in playlist_url:
-                playlist_id = playlist_url.split('playlist/')[1].split('?')[0]
-            else:
-                playlist_id = playlist_url
+            playlist_id = parse_playlist_id(playlist_url)
             
             # Get playlist details
-            playlist = self.sp.playlist(playlist_id)
-            return {
-                'id': playlist_id,
-                'name': playlist['name'],
-                'description': playlist.get('description', ''),
-                'owner': playlist['owner']['display_name'],
-                'total_tracks': playlist['tracks']['total'],
-                'playlist_url': playlist['external_urls']['spotify']
-            }
+            playlist = self.scheduler.call(self.sp.playlist, playlist_id, fields=PLAYLIST_INFO_PROJECTION)
+            return self._playlist_info(playlist_id, playlist)
         except Exception as e:
             print(f"Error getting playlist info: {e}")
             return None
     
-    def get_playlist_tracks(self, playlist_id, limit=None):
-        """Get all tracks from a playlist"""
-        try:
-            tracks = []
-            offset = 0
-            batch_size = 100
-            
-            while True:
-                results = self.sp.playlist_tracks(
-                    playlist_id, 
-                    offset=offset, 
-                    limit=batch_size
+    def _playlist_info(self, playlist_id, playlist):
+        """Basic playlist info from a playlist API response"""
+        return {
+            'id': playlist_id,
+            'name': playlist['name'],
+            'description': playlist.get('description', ''),
+            'owner': playlist['owner']['display_name'],
+            'total_tracks': playlist['tracks']['total'],
+            'playlist_url': playlist['external_urls']['spotify'],
+            'snapshot_id': playlist.get('snapshot_id', '')
+        }
+    
+    def iter_playlist_pages(self, playlist_id, limit=None, total=None, max_workers=8,
+                            fields=PLAYLIST_TRACKS_PROJECTION):
+        """Yield pages of playlist items in playlist order as they arrive
+        
+        Pages are fetched concurrently, but at most max_workers pages are in
+        flight or waiting to be consumed at any time. Errors propagate to
+        the caller.
+        """
+        batch_size = 100
+        
+        # The first page tells us how many tracks there are in total
+        first_page = self.scheduler.call(
+            self.sp.playlist_tracks,
+            playlist_id,
+            offset=0,
+            limit=batch_size,
+            fields=fields
+        )
+        if total is None:
+            total = first_page['total']
+        if limit:
+            total = min(total, limit)
+        
+        yield first_page['items'][:total] if limit else first_page['items']
+        del first_page
+        
+        offsets = iter(range(batch_size, total, batch_size))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def submit(offset):
+                return executor.submit(
+                    self.scheduler.call,
+                    self.sp.playlist_tracks,
+                    playlist_id,
+                    offset=offset,
+                    limit=batch_size,
+                    fields=fields
                 )
-                
-                if not results['items']:
-                    break
-                
-                tracks.extend(results['items'])
-                offset += batch_size
-                
-                # Check if we've reached the limit
-                if limit and len(tracks) >= limit:
-                    tracks = tracks[:limit]
-                    break
-                
-                # Small delay to be respectful to API
-                time.sleep(0.1)
             
+            # Sliding window of in-flight pages, consumed in offset order
+            window = deque((offset, submit(offset)) for offset in islice(offsets, max_workers))
+            while window:
+                offset, future = window.popleft()
+                items = future.result()['items']
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    window.append((next_offset, submit(next_offset)))
+                yield items[:total - offset] if limit else items
+    
+    def get_playlist_tracks(self, playlist_id, limit=None, total=None, max_workers=8,
+                            fields=PLAYLIST_TRACKS_PROJECTION):
+        """Get all tracks from a playlist, fetching pages concurrently
+        
+        Only the fields declared in track_schema are requested. Returns None
+        if any page could not be fetched, so a partial playlist is never
+        mistaken for the real one.
+        """
+        try:
+            tracks = []
+            for items in self.iter_playlist_pages(playlist_id, limit, total, max_workers, fields):
+                tracks.extend(items)
             return tracks
         except Exception as e:
             print(f"Error getting playlist tracks: {e}")
-            return []
+            return None
+    
+    def stream_album_data(self, playlist_id, total=None, keep_tracks=True, max_workers=8):
+        """Aggregate albums page by page without buffering the raw playlist
+        
+        Returns the AlbumAggregator, or None if any page failed.
+        """
+        aggregator = AlbumAggregator(keep_tracks=keep_tracks)
+        try:
+            for items in self.iter_playlist_pages(playlist_id, total=total, max_workers=max_workers):
+                aggregator.add_page(items)
+            return aggregator
+        except Exception as e:
+            print(f"Error getting playlist tracks: {e}")
+            return None
     
     def extract_album_data_from_tracks(self, tracks):
         """Extract and aggregate album data from playlist tracks"""
-        album_data = {}
-        
-        for item in tracks:
-            track = item['track']
-            if not track:  # Skip null tracks
-                continue
-                
-            album = track['album']
-            album_id = album['id']
-            
-            if album_id not in album_data:
-                album_data[album_id] = {
-                    'id': album_id,
-                    'name': album['name'],
-                    'artist': album['artists'][0]['name'],
-                    'artist_id': album['artists'][0]['id'],
-                    'release_date': album['release_date'],
-                    'total_tracks': album['total_tracks'],
-                    'album_type': album['album_type'],
-                    'images': album['images'],
-                    'external_url': album['external_urls']['spotify'],
-                    'track_count': 0,
-                    'total_popularity': 0,
-                    'tracks': [],
-                    'playlist_positions': []  # Track positions in playlist
-                }
-            
-            album_data[album_id]['track_count'] += 1
-            album_data[album_id]['total_popularity'] += track['popularity']
-            album_data[album_id]['tracks'].append({
-                'name': track['name'],
-                'popularity': track['popularity'],
-                'duration_ms': track['duration_ms'],
-                'added_at': item.get('added_at', '')
-            })
+        aggregator = AlbumAggregator()
+        aggregator.add_page(tracks)
+        return aggregator.albums()
+    
+    def get_user_playlists(self):
+        """Get every playlist of the current user (None if the request failed)"""
+        try:
+            playlists = []
+            offset = 0
+            while True:
+                page = self.scheduler.call(self.sp.current_user_playlists, limit=50, offset=offset)
+                playlists.extend(page['items'])
+                if not page.get('next'):
+                    return playlists
+                offset += 50
+        except Exception as e:
+            print(f"Error getting user playlists: {e}")
+            return None
+    
+    def get_playlist_entries(self, playlist_id, total=None):
+        """Get (track id, added_at) for every playlist item using a minimal projection"""
+        items = self.get_playlist_tracks(
+            playlist_id,
+            total=total,
+            fields=PLAYLIST_ENTRIES_PROJECTION
+        )
+        if items is None:
+            return None
         
-        # Convert to list and sort by track count (most represented albums first)
-        albums_list = list(album_data.values())
-        albums_list.sort(key=lambda x: (x['track_count'], x['total_popularity']), reverse=True)
+        return self.entries_from_items(items)
+    
+    def entries_from_items(self, items):
+        """(track id, added_at) pairs identifying each playlist item"""
+        return [
+            (item['track']['id'], item.get('added_at', ''))
+            for item in items
+            if item.get('track') and item['track'].get('id')
+        ]
+    
+    def entries_from_albums(self, albums):
+        """(track id, added_at) pairs of the tracks kept in album records
         
-        return albums_list
+        Empty unless every track was kept, since partial entries would make
+        the next sync treat the missing tracks as added.
+        """
+        if any(len(album.tracks) != album.track_count for album in albums):
+            return []
+        return [
+            (track.get('id'), track.get('added_at', ''))
+            for album in albums
+            for track in album.tracks
+            if track.get('id')
+        ]
     
-    def generate_playlist_metadata(self, playlist_info, albums):
-        """Generate metadata for 3D visualization"""
-        metadata = {
-            'extraction_date': datetime.now().isoformat(),
-            'playlist_info': playlist_info,
-            'total_albums': len(albums),
-            'albums': []
+    def get_tracks_by_id(self, track_ids):
+        """Get full track objects in batches of 50 (None if any batch failed)"""
+        try:
+            tracks = []
+            for start in range(0, len(track_ids), 50):
+                results = self.scheduler.call(self.sp.tracks, track_ids[start:start + 50])
+                tracks.extend(results['tracks'])
+            return tracks
+        except Exception as e:
+            print(f"Error getting tracks: {e}")
+            return None
+    
+    def build_sync_state(self, playlist_info, entries):
+        """Snapshot and added_at watermarks stored next to the album output"""
+        return {
+            'playlist_id': playlist_info['id'],
+            'snapshot_id': playlist_info.get('snapshot_id', ''),
+            'synced_at': datetime.now().isoformat(),
+            'watermark': max((added_at for _, added_at in entries), default=''),
+            # Streamed by write_json, so no second copy of the entries is built
+            'entries': (list(entry) for entry in entries)
         }
+    
+    def load_sync_state(self, filename):
+        """Load a previously saved sync state (None if there is none)"""
+        filepath = f'../data/{filename}'
+        if not os.path.exists(filepath):
+            return None
+        return read_json(filepath)
+    
+    def sync_playlist(self, playlist_info, state, albums):
+        """Apply only the changes since the last sync to existing album aggregates
+        
+        Returns (albums, state, added, removed), or None if the delta could
+        not be fetched.
+        """
+        entries = self.get_playlist_entries(playlist_info['id'], total=playlist_info['total_tracks'])
+        if entries is None:
+            return None
+        
+        previous = Counter(tuple(entry) for entry in state['entries'])
+        current = Counter(entries)
+        removed = previous - current
+        added = current - previous
         
-        for i, album in enumerate(albums[:40]):  # Top 40 for 3D visualization
-            album_meta = {
-                'rank': i + 1,
-                'id': album['id'],
-                'name': album['name'],
-                'artist': album['artist'],
-                'release_date': album['release_date'],
-                'total_tracks': album['total_tracks'],
-                'album_type': album['album_type'],
-                'image_url': album['images'][0]['url'] if album['images'] else '',
-                'spotify_url': album['external_url'],
-                'track_count': album['track_count'],
-                'total_popularity': album['total_popularity'],
-                'avg_popularity': album['total_popularity'] / album['track_count'] if album['track_count'] > 0 else 0
-            }
-            metadata['albums'].append(album_meta)
+        # Drop removed tracks from their albums
+        album_data = {album.id: album for album in albums}
+        for album in albums:
+            kept = []
+            for track in album.tracks:
+                key = (track.get('id'), track.get('added_at', ''))
+                if removed[key] > 0:
+                    removed[key] -= 1
+                    album.track_count -= 1
+                    album.total_popularity -= track.popularity
+                else:
+                    kept.append(track)
+            album.tracks = kept
+            if album.track_count <= 0:
+                del album_data[album.id]
         
-        return metadata
+        # Fetch full objects only for the newly added tracks
+        added_entries = list(added.elements())
+        full_tracks = self.get_tracks_by_id([track_id for track_id, _ in added_entries])
+        if full_tracks is None:
+            return None
+        aggregator = AlbumAggregator(album_data)
+        for (_, added_at), track in zip(added_entries, full_tracks):
+            aggregator.add({'track': track, 'added_at': added_at})
+        
+        new_state = self.build_sync_state(playlist_info, entries)
+        return aggregator.albums(), new_state, len(added_entries), sum((previous - current).values())
     
     def save_to_json(self, data, filename):
         """Save data to JSON file"""
         os.makedirs('../data', exist_ok=True)
         filepath = f'../data/{filename}'
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(filepath, data, default=record_to_json)
         print(f"Data saved to {filepath}")
     
-    def save_to_csv(self, data, filename):
-        """Save data to CSV file"""
-        os.makedirs('../data', exist_ok=True)
-        filepath = f'../data/{filename}'
+def safe_playlist_name(name):
+    """Filename-safe version of a playlist name"""
+    safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    return safe_name.replace(' ', '_')
+
+def playlist_file_stem(playlist_info, shared_names=()):
+    """Filename stem of a playlist's outputs: its safe name, or name_<id> when needed
+    
+    The id is added when the name sanitizes to nothing (it is used alone
+    then), when another playlist in the same run has the same safe name
+    (shared_names), or when existing outputs under the name belong to
+    another playlist.
+    """
+    safe_name = safe_playlist_name(playlist_info['name'])
+    if not safe_name:
+        return playlist_info['id']
+    if safe_name not in shared_names:
+        sync_path = f'../data/playlist_{safe_name}_sync.json'
+        if not os.path.exists(sync_path) or read_json(sync_path).get('playlist_id') == playlist_info['id']:
+            return safe_name
+    return f"{safe_name}_{playlist_info['id']}"
+
+def shared_playlist_names(infos):
+    """Safe names used by more than one of the resolved playlists (None entries are skipped)"""
+    names_by_id = {info['id']: safe_playlist_name(info['name']) for info in infos if info}
+    name_counts = Counter(names_by_id.values())
+    return {name for name, count in name_counts.items() if count > 1}
+
+def extract_playlist(extractor, playlist_url, full=False, log=print, playlist_info=None, shared_names=(),
+                     keep_tracks=True):
+    """Extract one playlist and write its playlist_<name>_* outputs
+    
+    playlist_info skips the info request when the caller already has it;
+    shared_names are safe names used by several playlists of the run (see
+    playlist_file_stem). keep_tracks=False keeps only each album's first
+    track (less memory for huge playlists; the next change is then
+    re-extracted in full). Returns a result dict (status, timing, album
+    count, error) for run summaries.
+    """
+    started = time.perf_counter()
+    result = {
+        'playlist': playlist_url,
+        'name': None,
+        'status': 'failed',
+        'albums': 0,
+        'seconds': 0,
+        'error': None,
+        'outputs': []
+    }
+    
+    def finish(status=None, error=None):
+        if status:
+            result['status'] = status
+        if error:
+            result['error'] = error
+            log(f"❌ {error}")
+        result['seconds'] = round(time.perf_counter() - started, 2)
+        return result
+    
+    # Get playlist info
+    if playlist_info is None:
+        log("📋 Getting playlist information...")
+        playlist_info = extractor.get_playlist_info(playlist_url)
+    if not playlist_info:
+        return finish(error="Could not retrieve playlist information")
+    
+    result['name'] = playlist_info['name']
+    log(f"✅ Playlist: {playlist_info['name']}")
+    log(f"   Owner: {playlist_info['owner']}")
+    log(f"   Tracks: {playlist_info['total_tracks']}")
+    
+    # Generate safe filename from playlist name
+    safe_name = playlist_file_stem(playlist_info, shared_names)
+    
+    # Use the stored snapshot and watermarks when we have a previous run
+    sync_filename = f'playlist_{safe_name}_sync.json'
+    albums_path = f'../data/playlist_{safe_name}_albums.json'
+    state = None if full else extractor.load_sync_state(sync_filename)
+    if state and state.get('playlist_id') != playlist_info['id']:
+        state = None
+    
+    previous_albums = None
+    if state and os.path.exists(albums_path):
+        previous_albums = read_json(albums_path)
+        # Outputs written before track ids were stored can't be patched
+        if any('id' not in t for a in previous_albums for t in a['tracks']):
+            previous_albums = None
+        else:
+            previous_albums = [Album.from_dict(a) for a in previous_albums]
+    
+    if state and previous_albums is not None:
+        if state['snapshot_id'] and state['snapshot_id'] == playlist_info['snapshot_id']:
+            log("✅ Playlist unchanged since last sync, nothing to do")
+            result['albums'] = len(previous_albums)
+            return finish('unchanged')
+        # Outputs written with keep_tracks=False have no entries to diff against
+        if not state['entries']:
+            previous_albums = None
+    
+    if state and previous_albums is not None:
+        log("🔄 Playlist changed, fetching only the delta...")
+        sync_result = extractor.sync_playlist(playlist_info, state, previous_albums)
+        if sync_result is None:
+            return finish(error="Failed to fetch the playlist changes, no files were written")
+        albums, state, added_count, removed_count = sync_result
+        log(f"✅ Applied {added_count} added and {removed_count} removed tracks")
+        status = 'synced'
+    else:
+        # Extract tracks, folding each page into the album aggregates as it arrives
+        log("🎵 Extracting playlist tracks and processing album data...")
+        aggregator = extractor.stream_album_data(
+            playlist_info['id'],
+            total=playlist_info['total_tracks'],
+            keep_tracks=keep_tracks
+        )
         
-        if isinstance(data, list) and data:
-            # Flatten the data for CSV
-            flattened_data = []
-            for item in data:
-                if isinstance(item, dict):
-                    flat_item = {}
-                    for key, value in item.items():
-                        if key == 'tracks':
-                            flat_item['track_names'] = ', '.join([t['name'] for t in value])
-                            flat_item['avg_track_popularity'] = sum(t['popularity'] for t in value) / len(value)
-                        elif key == 'images':
-                            flat_item['image_url'] = value[0]['url'] if value else ''
-                        else:
-                            flat_item[key] = value
-                    flattened_data.append(flat_item)
-            
-            df = pd.DataFrame(flattened_data)
-            df.to_csv(filepath, index=False, encoding='utf-8')
-            print(f"Data saved to {filepath}")
+        if aggregator is None:
+            return finish(error="Failed to fetch the full playlist, no files were written")
+        
+        if not aggregator.item_count:
+            return finish(error="No tracks found in playlist")
+        
+        log(f"✅ Extracted {aggregator.item_count} tracks")
+        
+        albums = aggregator.albums()
+        state = extractor.build_sync_state(playlist_info, extractor.entries_from_albums(albums))
+        status = 'extracted'
+    
+    if not albums:
+        return finish(error="No album data extracted")
+    
+    log(f"✅ Found {len(albums)} unique albums")
+    result['albums'] = len(albums)
+    
+    log("💾 Saving data...")
+    result['outputs'] = write_playlist_outputs(playlist_info, safe_name, albums, state, log)
+    result['top_albums'] = albums[:10]
+    return finish(status)
+
+def write_playlist_outputs(playlist_info, safe_name, albums, state, log=print):
+    """Write a playlist's playlist_<safe_name>_* files and update the album store
+    
+    Shared by the sync and async extractors. Returns the output filenames.
+    """
+    # Render every output (albums, CSV, 3D metadata and the playlist-ordered
+    # files) in one pass and write them concurrently
+    outputs = write_album_outputs(
+        albums,
+        output_names(f'playlist_{safe_name}'),
+        metadata_header={
+            'extraction_date': datetime.now().isoformat(),
+            'playlist_info': playlist_info
+        },
+        playlist_name=playlist_info['name'],
+        extra_outputs={f'playlist_{safe_name}_sync.json': state}
+    )
+    
+    # Columnar copy for analytics (skipped without pyarrow)
+    parquet_paths = save_to_parquet(albums, f'playlist_{safe_name}')
+    outputs += [os.path.basename(path) for path in parquet_paths or []]
+    
+    # Keep the indexed album store in step with the files
+    try:
+        get_default_store().save_playlist(playlist_info, albums)
+    except sqlite3.Error as e:
+        log(f"⚠️  Could not update the album store: {e}")
+    return outputs
+
+def run_bulk_extraction(extractor, playlist_urls, workers=4, full=False, keep_tracks=True):
+    """Extract many playlists concurrently with one shared client
+    
+    Writes playlist_run_summary.json with per-playlist timings and failures.
+    """
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    
+    # Resolve every playlist first so same-named playlists get distinct
+    # filenames whatever order the workers finish in
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        infos = list(executor.map(extractor.get_playlist_info, playlist_urls))
+    shared_names = shared_playlist_names(infos)
+    
+    def extract(playlist_url, playlist_info):
+        def log(message):
+            print(f"[{playlist_url}] {message}")
+        try:
+            return extract_playlist(extractor, playlist_url, full=full, log=log,
+                                    playlist_info=playlist_info, shared_names=shared_names,
+                                    keep_tracks=keep_tracks)
+        except Exception as e:
+            log(f"❌ Unexpected error: {e}")
+            return {'playlist': playlist_url, 'name': None, 'status': 'failed',
+                    'albums': 0, 'seconds': 0, 'error': str(e), 'outputs': []}
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(extract, playlist_urls, infos))
+    
+    for result in results:
+        result.pop('top_albums', None)
+    
+    summary = {
+        'started_at': started_at,
+        'finished_at': datetime.now().isoformat(),
+        'total_seconds': round(time.perf_counter() - started, 2),
+        'workers': workers,
+        'playlists': len(results),
+        'failed': sum(1 for r in results if r['status'] == 'failed'),
+        'api': extractor.scheduler.stats(),
+        'results': results
+    }
+    extractor.save_to_json(summary, 'playlist_run_summary.json')
+    return summary
+
+def print_connection_stats():
+    """Show how well the pooled session reused connections"""
+    for host, stats in connection_stats().items():
+        print(f"🔌 {host}: {stats['requests']} requests over {stats['connections']} connections")
 
 def main():
+    parser = argparse.ArgumentParser(description="Extract album data from Spotify playlists")
+    parser.add_argument('playlists', nargs='*',
+                        help="playlist URLs or IDs (prompted for one if omitted)")
+    parser.add_argument('--all', action='store_true',
+                        help="extract every playlist returned by current_user_playlists")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="how many playlists to extract at once in bulk mode (default: 4)")
+    parser.add_argument('--full', action='store_true',
+                        help="ignore the stored sync state and re-extract the whole playlist")
+    parser.add_argument('--no-tracks', dest='keep_tracks', action='store_false',
+                        help="keep only the first track of each album (less memory for huge "
+                             "playlists; later runs re-extract changed playlists in full)")
+    args = parser.parse_args()
+    
     print("🎵 Spotify Playlist Data Extractor")
     print("=" * 50)
     
@@ -204,69 +575,58 @@ def main():
         print("Make sure to use http://127.0.0.1:8888/callback as your redirect URI")
         return
     
-    # Get playlist URL from user
-    playlist_url = input("Enter Spotify playlist URL or ID: ").strip()
-    if not playlist_url:
-        print("❌ No playlist URL provided")
-        return
-    
     extractor = PlaylistDataExtractor()
     
-    # Get playlist info
-    print("📋 Getting playlist information...")
-    playlist_info = extractor.get_playlist_info(playlist_url)
-    if not playlist_info:
-        print("❌ Could not retrieve playlist information")
+    # Bulk, non-interactive mode
+    if args.all or len(args.playlists) > 1:
+        playlist_urls = list(args.playlists)
+        if args.all:
+            print("📋 Listing your playlists...")
+            user_playlists = extractor.get_user_playlists()
+            if user_playlists is None:
+                print("❌ Could not list your playlists")
+                return
+            playlist_urls.extend(p['id'] for p in user_playlists if p['id'] not in playlist_urls)
+        
+        print(f"🎵 Extracting {len(playlist_urls)} playlists with {args.workers} workers...")
+        summary = run_bulk_extraction(extractor, playlist_urls, workers=args.workers, full=args.full,
+                                      keep_tracks=args.keep_tracks)
+        
+        print(f"\n📊 Run Summary ({summary['total_seconds']}s):")
+        print("-" * 50)
+        for result in summary['results']:
+            label = result['name'] or result['playlist']
+            icon = "❌" if result['status'] == 'failed' else "✅"
+            detail = result['error'] if result['error'] else f"{result['albums']} albums"
+            print(f"{icon} {label}: {result['status']} in {result['seconds']}s ({detail})")
+        print("\n📁 Summary saved to ../data/playlist_run_summary.json")
+        print_connection_stats()
         return
     
-    print(f"✅ Playlist: {playlist_info['name']}")
-    print(f"   Owner: {playlist_info['owner']}")
-    print(f"   Tracks: {playlist_info['total_tracks']}")
-    
-    # Extract tracks
-    print("🎵 Extracting playlist tracks...")
-    tracks = extractor.get_playlist_tracks(playlist_info['id'])
-    
-    if not tracks:
-        print("❌ No tracks found in playlist")
+    # Get playlist URL from user
+    if args.playlists:
+        playlist_url = args.playlists[0]
+    else:
+        playlist_url = input("Enter Spotify playlist URL or ID: ").strip()
+    if not playlist_url:
+        print("❌ No playlist URL provided")
         return
     
-    print(f"✅ Extracted {len(tracks)} tracks")
-    
-    # Extract album data
-    print("📊 Processing album data...")
-    albums = extractor.extract_album_data_from_tracks(tracks)
-    
-    if not albums:
-        print("❌ No album data extracted")
+    result = extract_playlist(extractor, playlist_url, full=args.full, keep_tracks=args.keep_tracks)
+    if result['status'] in ('failed', 'unchanged'):
         return
     
-    print(f"✅ Found {len(albums)} unique albums")
-    
-    # Generate safe filename from playlist name
-    safe_name = "".join(c for c in playlist_info['name'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    safe_name = safe_name.replace(' ', '_')
-    
-    # Save data in different formats
-    print("💾 Saving data...")
-    extractor.save_to_json(albums, f'playlist_{safe_name}_albums.json')
-    extractor.save_to_csv(albums, f'playlist_{safe_name}_albums.csv')
-    
-    # Generate metadata for 3D visualization
-    metadata = extractor.generate_playlist_metadata(playlist_info, albums)
-    extractor.save_to_json(metadata, f'playlist_{safe_name}_3d_metadata.json')
-    
     # Display top albums by track count
-    print(f"\n🏆 Top Albums in '{playlist_info['name']}':")
+    print(f"\n🏆 Top Albums in '{result['name']}':")
     print("-" * 50)
-    for i, album in enumerate(albums[:10]):
+    for i, album in enumerate(result['top_albums']):
         print(f"{i+1:2d}. {album['name']} - {album['artist']} ({album['track_count']} tracks)")
     
     print(f"\n✅ Playlist extraction complete!")
     print(f"📁 Check the ../data/ directory for output files:")
-    print(f"   - playlist_{safe_name}_albums.json")
-    print(f"   - playlist_{safe_name}_albums.csv")
-    print(f"   - playlist_{safe_name}_3d_metadata.json")
+    for output in result['outputs']:
+        print(f"   - {output}")
+    print_connection_stats()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
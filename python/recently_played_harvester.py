@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Recently Played Harvester
+Collects recently played tracks into an append-only listening log with a
+persisted cursor, and keeps daily listening rollups up to date incrementally
+
+Run it from cron (e.g. every 30 minutes, Spotify only keeps the last 50 plays)
+or with --interval to keep it running.
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+from json_io import read_json, write_json
+from spotify_data_extractor import SpotifyDataExtractor
+
+HISTORY_DIR = '../data/listening_history'
+STATE_FILE = 'state.json'
+DICTIONARY_FILE = 'dictionary.json'
+PLAYS_FILE = 'plays.log'
+ROLLUPS_FILE = 'daily_rollups.json'
+
+PAGE_SIZE = 50
+
+
+def played_at_ms(played_at):
+    """Spotify 'played_at' timestamp -> unix milliseconds"""
+    return int(datetime.fromisoformat(played_at.replace('Z', '+00:00')).timestamp() * 1000)
+
+
+class ListeningHistory:
+    """Append-only play log with dictionary-encoded ids and daily rollups
+
+    plays.log holds one "played_at_ms,track_index,album_index" row per play.
+    The indexes point into dictionary.json, which stores every track,
+    album and artist id once.
+    """
+
+    def __init__(self, history_dir=HISTORY_DIR):
+        self.history_dir = history_dir
+        os.makedirs(history_dir, exist_ok=True)
+        self.state = self._load(STATE_FILE, {'after_cursor': None, 'total_plays': 0, 'last_run': None})
+        self.dictionary = self._load(DICTIONARY_FILE, {'tracks': [], 'albums': [], 'artists': []})
+        self.rollups = self._load(ROLLUPS_FILE, {})
+
+        # Reverse lookups, rebuilt from the dictionary on load
+        self._track_index = {t['id']: i for i, t in enumerate(self.dictionary['tracks'])}
+        self._album_index = {album_id: i for i, album_id in enumerate(self.dictionary['albums'])}
+        self._artist_index = {artist_id: i for i, artist_id in enumerate(self.dictionary['artists'])}
+        self._recover()
+
+    def _path(self, filename):
+        return os.path.join(self.history_dir, filename)
+
+    def _load(self, filename, default):
+        if os.path.exists(self._path(filename)):
+            return read_json(self._path(filename))
+        return default
+
+    def _save(self, filename, data):
+        write_json(self._path(filename), data, indent=None)
+
+    def _last_logged_ms(self):
+        """played_at of the last complete log row, dropping a torn final row"""
+        with open(self._path(PLAYS_FILE), 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            f.seek(max(0, end - 4096))
+            tail = f.read()
+            if tail and not tail.endswith(b'\n'):
+                f.truncate(end - (len(tail) - tail.rfind(b'\n') - 1))
+                tail = tail[:tail.rfind(b'\n') + 1]
+        lines = tail.splitlines()
+        return int(lines[-1].split(b',')[0]) if lines else 0
+
+    def _recover(self):
+        """Catch up with plays logged after the saved cursor (a run died before saving)
+
+        The log is the source of truth, so the rollups are rebuilt from it.
+        """
+        if not os.path.exists(self._path(PLAYS_FILE)):
+            return
+        if self._last_logged_ms() <= (self.state['after_cursor'] or 0):
+            return
+
+        with open(self._path(PLAYS_FILE), encoding='utf-8') as f:
+            rows = [tuple(int(value) for value in line.split(',')) for line in f]
+        missing = len(rows) - self.state['total_plays']
+        self.rollups = {}
+        for ms, track_index, _ in rows:
+            self._add_to_rollups(ms, track_index)
+        self.state['after_cursor'] = rows[-1][0]
+        self.state['total_plays'] = len(rows)
+        self._save(ROLLUPS_FILE, self.rollups)
+        self._save(STATE_FILE, self.state)
+        print(f"♻️  Recovered {missing} logged plays missing from the saved state")
+
+    def _encode(self, index, values, value):
+        if value not in index:
+            index[value] = len(values)
+            values.append(value)
+        return index[value]
+
+    def _encode_track(self, track):
+        """Dictionary index of a track, registering it (and its album/artist) if new"""
+        if track['id'] not in self._track_index:
+            album_index = self._encode(self._album_index, self.dictionary['albums'], track['album']['id'])
+            artist_index = self._encode(self._artist_index, self.dictionary['artists'], track['artists'][0]['id'])
+            self._track_index[track['id']] = len(self.dictionary['tracks'])
+            self.dictionary['tracks'].append({
+                'id': track['id'],
+                'name': track['name'],
+                'album': album_index,
+                'artist': artist_index,
+                'duration_ms': track['duration_ms']
+            })
+        return self._track_index[track['id']]
+
+    def _add_to_rollups(self, played_ms, track_index):
+        """Fold one play into its day's rollup"""
+        track = self.dictionary['tracks'][track_index]
+        day = datetime.fromtimestamp(played_ms / 1000, tz=timezone.utc).date().isoformat()
+        rollup = self.rollups.setdefault(day, {'plays': 0, 'minutes': 0.0, 'albums': {}, 'artists': {}})
+        rollup['plays'] += 1
+        rollup['minutes'] = round(rollup['minutes'] + track['duration_ms'] / 60000, 2)
+        album_key = str(track['album'])
+        artist_key = str(track['artist'])
+        rollup['albums'][album_key] = rollup['albums'].get(album_key, 0) + 1
+        rollup['artists'][artist_key] = rollup['artists'].get(artist_key, 0) + 1
+
+    def append_plays(self, items):
+        """Append plays newer than the cursor; returns how many were new"""
+        cursor = self.state['after_cursor'] or 0
+        plays = sorted(
+            (played_at_ms(item['played_at']), item['track'])
+            for item in items
+            if item.get('track') and item['track'].get('id')
+        )
+        plays = [(ms, track) for ms, track in plays if ms > cursor]
+        if not plays:
+            return 0
+
+        rows = []
+        for ms, track in plays:
+            track_index = self._encode_track(track)
+            album_index = self.dictionary['tracks'][track_index]['album']
+            rows.append(f"{ms},{track_index},{album_index}\n")
+            self._add_to_rollups(ms, track_index)
+
+        # Every index a row uses is saved before the row is logged, and the
+        # cursor right after it, so a crash never re-logs or re-numbers plays
+        self._save(DICTIONARY_FILE, self.dictionary)
+        with open(self._path(PLAYS_FILE), 'a', encoding='utf-8') as f:
+            f.writelines(rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.state['after_cursor'] = plays[-1][0]
+        self.state['total_plays'] += len(plays)
+        self._save(ROLLUPS_FILE, self.rollups)
+        self._save(STATE_FILE, self.state)
+        return len(plays)
+
+    def save(self):
+        """Record the run; the plays themselves are saved as each page is appended"""
+        self.state['last_run'] = datetime.now().isoformat()
+        self._save(STATE_FILE, self.state)
+
+
+def harvest(extractor, history):
+    """Fetch every play after the stored cursor and append it to the history"""
+    new_plays = 0
+    while True:
+        items = extractor.get_recently_played(limit=PAGE_SIZE, after=history.state['after_cursor'])
+        if items is None:
+            print("❌ Failed to fetch recently played tracks, cursor left unchanged")
+            break
+        added = history.append_plays(items)
+        new_plays += added
+        if added == 0 or len(items) < PAGE_SIZE:
+            break
+
+    history.save()
+    return new_plays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvest recently played tracks into a listening log")
+    parser.add_argument('--interval', type=int, default=0,
+                        help="keep running and harvest every N seconds (default: run once)")
+    args = parser.parse_args()
+
+    print("🎧 Recently Played Harvester")
+    print("=" * 50)
+
+    extractor = SpotifyDataExtractor()
+    history = ListeningHistory()
+
+    while True:
+        new_plays = harvest(extractor, history)
+        print(f"✅ {new_plays} new plays ({history.state['total_plays']} total) "
+              f"saved to {HISTORY_DIR}")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
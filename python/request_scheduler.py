@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Request Scheduler
+Rate-limit-aware scheduling for Spotify API calls shared by all extractors
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import requests
+from spotipy.exceptions import SpotifyException
+
+# Spotify does not publish a fixed budget (it is a rolling 30 second window),
+# these defaults keep us right under the limit observed for a development app
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_BURST = 20
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 6
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+
+# Status codes worth retrying; everything else is a real error
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Statuses the pooled session retries itself (see spotify_client.create_session);
+# 429 responses reach the scheduler with their Retry-After header instead
+SPOTIPY_STATUS_FORCELIST = (500, 502, 503, 504)
+
+
+class RequestFailedError(Exception):
+    """Raised when a request still fails after all retries"""
+
+
+class RequestScheduler:
+    """Token bucket rate limiter with a global concurrency cap and retries"""
+
+    # Transport errors that are worth retrying with backoff
+    retryable_exceptions = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+    def __init__(self,
+                 requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                 burst=DEFAULT_BURST,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY):
+        self.rate = float(requests_per_second)
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._create_primitives(max_concurrency)
+
+        # Counters for reporting
+        self.request_count = 0
+        self.throttled_count = 0
+        self.retry_count = 0
+
+    def _create_primitives(self, max_concurrency):
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def _take_token(self):
+        """Take a token if one is available, otherwise return how long to wait
+
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self.request_count += 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def _acquire_token(self):
+        """Block until the bucket has a token and no Retry-After pause is active"""
+        while True:
+            with self._lock:
+                wait = self._take_token()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def _pause_all(self, seconds):
+        """Stop every caller from sending requests for the given duration"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    def _backoff_delay(self, attempt):
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(error):
+        """Read the Retry-After header (in seconds) from a Spotify error"""
+        headers = getattr(error, 'headers', None) or {}
+        value = headers.get('Retry-After') or headers.get('retry-after')
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def _retry_delay(self, func, error, attempt):
+        """How long to wait before retrying, or raise if the error is final"""
+        retryable = (
+            isinstance(error, self.retryable_exceptions) or
+            (isinstance(error, SpotifyException) and error.http_status in RETRYABLE_STATUS_CODES)
+        )
+        if not retryable or attempt == self.max_retries:
+            raise RequestFailedError(
+                f"{getattr(func, '__name__', 'request')} failed after "
+                f"{attempt + 1} attempt(s): {error}"
+            ) from error
+
+        self.retry_count += 1
+        retry_after = self._retry_after(error) if isinstance(error, SpotifyException) else None
+        if retry_after is None:
+            return self._backoff_delay(attempt)
+
+        # Honour Retry-After for every caller, plus a little jitter so the
+        # waiting workers don't all fire at the same instant
+        self.throttled_count += 1
+        with self._lock:
+            self._pause_all(retry_after)
+        return retry_after + random.uniform(0, self.base_delay)
+
+    def call(self, func, *args, **kwargs):
+        """Run a Spotify client call under the rate limit, retrying when allowed"""
+        for attempt in range(self.max_retries + 1):
+            self._acquire_token()
+            with self._slots:
+                try:
+                    return func(*args, **kwargs)
+                except (SpotifyException,) + self.retryable_exceptions as e:
+                    error = e
+            time.sleep(self._retry_delay(func, error, attempt))
+
+    def stats(self):
+        """Summary of the work done by this scheduler"""
+        return {
+            'requests': self.request_count,
+            'retries': self.retry_count,
+            'throttled': self.throttled_count
+        }
+
+
+class AsyncRequestScheduler(RequestScheduler):
+    """asyncio flavour of RequestScheduler for coroutine-based clients"""
+
+    def __init__(self, *args, retryable_exceptions=(ConnectionError, asyncio.TimeoutError), **kwargs):
+        self.retryable_exceptions = tuple(retryable_exceptions)
+        super().__init__(*args, **kwargs)
+
+    def _create_primitives(self, max_concurrency):
+        # Plain lock: _take_token never awaits, so it can't be interleaved
+        self._lock = threading.Lock()
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def _acquire_token(self):
+        while True:
+            with self._lock:
+                wait = self._take_token()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    async def call(self, func, *args, **kwargs):
+        """Await a client coroutine under the rate limit, retrying when allowed"""
+        for attempt in range(self.max_retries + 1):
+            await self._acquire_token()
+            async with self._slots:
+                try:
+                    return await func(*args, **kwargs)
+                except (SpotifyException,) + self.retryable_exceptions as e:
+                    error = e
+            await asyncio.sleep(self._retry_delay(func, error, attempt))
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_default_scheduler():
+    """Process-wide scheduler so every extractor shares one request budget"""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
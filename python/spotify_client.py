@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Spotify Client Factory
+One pooled HTTP session, one cached auth manager and one Spotify client
+shared by every extractor, downloader and connection test in a process
+"""
+
+import os
+import threading
+
+import requests
+import spotipy
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOAuth
+from urllib3.util.retry import Retry
+
+from request_scheduler import DEFAULT_MAX_CONCURRENCY, SPOTIPY_STATUS_FORCELIST
+
+# Every scope the scripts need, so one cached token serves all of them
+SPOTIFY_SCOPES = ' '.join([
+    'user-top-read',
+    'user-read-recently-played',
+    'playlist-read-private',
+    'playlist-read-collaborative',
+])
+
+DEFAULT_REDIRECT_URI = 'http://127.0.0.1:3000/callback'
+
+# Connections kept open per host; matched to the scheduler's concurrency cap
+# plus headroom for the cover downloaders
+POOL_MAXSIZE = DEFAULT_MAX_CONCURRENCY * 2
+# Number of distinct hosts to keep pools for (api, accounts, i.scdn.co, ...)
+POOL_CONNECTIONS = 8
+
+_lock = threading.RLock()
+_session = None
+_auth_manager = None
+_spotify_client = None
+_app_client = None
+
+
+def create_session(pool_maxsize=POOL_MAXSIZE, pool_connections=POOL_CONNECTIONS):
+    """requests.Session with keep-alive pools sized for our concurrency
+
+    5xx responses are retried here; 429s are left to the RequestScheduler,
+    which needs their Retry-After header. urllib3 would otherwise retry any
+    response carrying Retry-After itself, sleeping while the caller holds a
+    scheduler slot, hence respect_retry_after_header=False.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        connect=None,
+        read=False,
+        allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+        status=3,
+        backoff_factor=0.3,
+        status_forcelist=SPOTIPY_STATUS_FORCELIST,
+        respect_retry_after_header=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+        pool_block=True
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """Process-wide pooled session"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def get_auth_manager():
+    """Process-wide SpotifyOAuth, so token refreshes happen once for everyone"""
+    global _auth_manager
+    with _lock:
+        if _auth_manager is None:
+            load_dotenv()
+            _auth_manager = SpotifyOAuth(
+                client_id=os.getenv('SPOTIFY_CLIENT_ID'),
+                client_secret=os.getenv('SPOTIFY_CLIENT_SECRET'),
+                redirect_uri=os.getenv('SPOTIFY_REDIRECT_URI', DEFAULT_REDIRECT_URI),
+                scope=SPOTIFY_SCOPES,
+                requests_session=get_session()
+            )
+        return _auth_manager
+
+
+def get_spotify_client():
+    """Process-wide user-authorized spotipy client on the pooled session"""
+    global _spotify_client
+    with _lock:
+        if _spotify_client is None:
+            _spotify_client = spotipy.Spotify(
+                auth_manager=get_auth_manager(),
+                requests_session=get_session()
+            )
+        return _spotify_client
+
+
+def get_app_client():
+    """Process-wide client-credentials client for public catalog endpoints"""
+    global _app_client
+    with _lock:
+        if _app_client is None:
+            load_dotenv()
+            _app_client = spotipy.Spotify(
+                auth_manager=SpotifyClientCredentials(
+                    client_id=os.getenv('SPOTIFY_CLIENT_ID'),
+                    client_secret=os.getenv('SPOTIFY_CLIENT_SECRET'),
+                    requests_session=get_session()
+                ),
+                requests_session=get_session()
+            )
+        return _app_client
+
+
+def connection_stats(session=None):
+    """How many connections were opened vs. requests sent, per host
+
+    A reuse ratio well above 1 means keep-alive is working.
+    """
+    session = session or get_session()
+    stats = {}
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        for key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools[key]
+            host = f"{pool.scheme}://{pool.host}"
+            entry = stats.setdefault(host, {'connections': 0, 'requests': 0})
+            entry['connections'] += pool.num_connections
+            entry['requests'] += pool.num_requests
+    for entry in stats.values():
+        entry['reuse_ratio'] = round(entry['requests'] / entry['connections'], 2) if entry['connections'] else 0
+    return stats
@@ -4,14 +4,27 @@ Spotify Data Extractor
 Extracts top tracks and albums from Spotify API for data visualization
 """
 
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-import pandas as pd
-import json
 import os
-from datetime import datetime
+import sqlite3
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 import time
 from dotenv import load_dotenv
+from request_scheduler import get_default_scheduler
+from spotify_client import get_spotify_client, connection_stats
+from album_outputs import write_album_outputs
+from album_records import Album, Track, record_to_json
+from album_store import get_default_store
+from json_io import write_json
+from parquet_export import save_to_parquet
+from track_schema import TIME_RANGES
+
+# How much each time range contributes to the blended album ranking
+RANGE_WEIGHTS = {
+    'short_term': 0.2,
+    'medium_term': 0.3,
+    'long_term': 0.5
+}
 
 class SpotifyDataExtractor:
     def __init__(self):
@@ -23,29 +36,35 @@ class SpotifyDataExtractor:
         self.client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
         self.redirect_uri = os.getenv('SPOTIFY_REDIRECT_URI', 'http://127.0.0.1:3000/callback')
         
-        # Initialize Spotify client
-        self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-            client_id=self.client_id,
-            client_secret=self.client_secret,
-            redirect_uri=self.redirect_uri,
-            scope='user-top-read user-read-recently-played'
-        ))
+        # Shared client on the pooled session (see spotify_client.py)
+        self.sp = get_spotify_client()
+        
+        # All API calls go through the shared rate-limit-aware scheduler
+        self.scheduler = get_default_scheduler()
     
     def get_top_tracks(self, time_range='long_term', limit=50):
-        """Get user's top tracks"""
+        """Get user's top tracks (None if the request failed)"""
         try:
-            results = self.sp.current_user_top_tracks(
+            results = self.scheduler.call(
+                self.sp.current_user_top_tracks,
                 time_range=time_range,
                 limit=limit
             )
             return results['items']
         except Exception as e:
             print(f"Error getting top tracks: {e}")
-            return []
+            return None
     
     def get_top_albums(self, time_range='long_term', limit=50):
         """Get user's top albums by analyzing top tracks"""
         tracks = self.get_top_tracks(time_range, limit)
+        if tracks is None:
+            return None
+        
+        return self.albums_from_tracks(tracks, limit)
+    
+    def albums_from_tracks(self, tracks, limit=50):
+        """Aggregate top tracks into albums ranked by total popularity"""
         album_data = {}
         
         for track in tracks:
@@ -53,105 +72,130 @@ class SpotifyDataExtractor:
             album_id = album['id']
             
             if album_id not in album_data:
-                album_data[album_id] = {
-                    'id': album_id,
-                    'name': album['name'],
-                    'artist': album['artists'][0]['name'],
-                    'artist_id': album['artists'][0]['id'],
-                    'release_date': album['release_date'],
-                    'total_tracks': album['total_tracks'],
-                    'album_type': album['album_type'],
-                    'images': album['images'],
-                    'external_url': album['external_urls']['spotify'],
-                    'track_count': 0,
-                    'total_popularity': 0,
-                    'tracks': []
-                }
+                album_data[album_id] = self._new_album_record(album)
             
-            album_data[album_id]['track_count'] += 1
-            album_data[album_id]['total_popularity'] += track['popularity']
-            album_data[album_id]['tracks'].append({
-                'name': track['name'],
-                'popularity': track['popularity'],
-                'duration_ms': track['duration_ms']
-            })
+            record = album_data[album_id]
+            record.track_count += 1
+            record.total_popularity += track['popularity']
+            record.tracks.append(Track(track['name'], track['popularity'], track['duration_ms']))
         
         # Convert to list and sort by total popularity
         albums_list = list(album_data.values())
-        albums_list.sort(key=lambda x: x['total_popularity'], reverse=True)
+        albums_list.sort(key=lambda x: x.total_popularity, reverse=True)
         
         return albums_list[:limit]
     
-    def get_recently_played(self, limit=50):
-        """Get recently played tracks"""
+    def _new_album_record(self, album, **extra):
+        """Empty album aggregate built from a Spotify album object"""
+        return Album.from_spotify(album, **extra)
+    
+    def get_all_top_tracks(self, time_range='long_term', page_size=50):
+        """Page through every top track Spotify returns for a time range (None on failure)"""
         try:
-            results = self.sp.current_user_recently_played(limit=limit)
+            tracks = []
+            offset = 0
+            while True:
+                results = self.scheduler.call(
+                    self.sp.current_user_top_tracks,
+                    time_range=time_range,
+                    limit=page_size,
+                    offset=offset
+                )
+                tracks.extend(results['items'])
+                if not results['items'] or not results.get('next'):
+                    return tracks
+                offset += page_size
+        except Exception as e:
+            print(f"Error getting {time_range} top tracks: {e}")
+            return None
+    
+    def get_top_tracks_all_ranges(self, time_ranges=TIME_RANGES):
+        """Fetch the full top track list of every time range concurrently"""
+        with ThreadPoolExecutor(max_workers=len(time_ranges)) as executor:
+            results = dict(zip(time_ranges, executor.map(self.get_all_top_tracks, time_ranges)))
+        
+        if any(tracks is None for tracks in results.values()):
+            return None
+        return results
+    
+    def get_blended_top_albums(self, time_ranges=TIME_RANGES, limit=50):
+        """Rank albums across several time ranges in one pass over the merged tracks
+        
+        Each track scores 1.0 at rank 1 down towards 0 at the end of a range's
+        list. An album's range score is the sum over its tracks, and the
+        blended score weights the ranges by RANGE_WEIGHTS.
+        """
+        tracks_by_range = self.get_top_tracks_all_ranges(time_ranges)
+        if tracks_by_range is None:
+            return None
+        
+        # Merge the ranges: one entry per track with its rank in each range
+        merged = {}
+        for time_range, tracks in tracks_by_range.items():
+            for rank, track in enumerate(tracks, 1):
+                entry = merged.setdefault(track['id'], {'track': track, 'ranks': {}})
+                entry['ranks'][time_range] = rank
+        
+        total_weight = sum(RANGE_WEIGHTS.get(r, 1.0) for r in time_ranges)
+        album_data = {}
+        
+        for entry in merged.values():
+            track = entry['track']
+            album = track['album']
+            album_id = album['id']
+            
+            if album_id not in album_data:
+                album_data[album_id] = self._new_album_record(
+                    album,
+                    range_scores={r: 0.0 for r in time_ranges},
+                    blended_score=0.0
+                )
+            
+            record = album_data[album_id]
+            record.track_count += 1
+            record.total_popularity += track['popularity']
+            for time_range, rank in entry['ranks'].items():
+                score = 1 - (rank - 1) / len(tracks_by_range[time_range])
+                record['range_scores'][time_range] += score
+                record['blended_score'] += score * RANGE_WEIGHTS.get(time_range, 1.0) / total_weight
+            record.tracks.append(Track(
+                track['name'],
+                track['popularity'],
+                track['duration_ms'],
+                ranks=entry['ranks']
+            ))
+        
+        albums_list = list(album_data.values())
+        for record in albums_list:
+            record['range_scores'] = {r: round(v, 4) for r, v in record['range_scores'].items()}
+            record['blended_score'] = round(record['blended_score'], 4)
+        albums_list.sort(key=lambda x: (x['blended_score'], x.total_popularity), reverse=True)
+        
+        return albums_list[:limit]
+    
+    def get_recently_played(self, limit=50, after=None):
+        """Get recently played tracks, optionally only those played after a
+        unix-millisecond cursor (None if the request failed)"""
+        try:
+            results = self.scheduler.call(self.sp.current_user_recently_played, limit=limit, after=after)
             return results['items']
         except Exception as e:
             print(f"Error getting recently played: {e}")
-            return []
+            return None
     
     def save_to_json(self, data, filename):
         """Save data to JSON file"""
         os.makedirs('../data', exist_ok=True)
         filepath = f'../data/{filename}'
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(filepath, data, default=record_to_json)
         print(f"Data saved to {filepath}")
-    
-    def save_to_csv(self, data, filename):
-        """Save data to CSV file"""
-        os.makedirs('../data', exist_ok=True)
-        filepath = f'../data/{filename}'
-        
-        if isinstance(data, list) and data:
-            # Flatten the data for CSV
-            flattened_data = []
-            for item in data:
-                if isinstance(item, dict):
-                    flat_item = {}
-                    for key, value in item.items():
-                        if key == 'tracks':
-                            flat_item['track_names'] = ', '.join([t['name'] for t in value])
-                            flat_item['avg_track_popularity'] = sum(t['popularity'] for t in value) / len(value)
-                        elif key == 'images':
-                            flat_item['image_url'] = value[0]['url'] if value else ''
-                        else:
-                            flat_item[key] = value
-                    flattened_data.append(flat_item)
-            
-            df = pd.DataFrame(flattened_data)
-            df.to_csv(filepath, index=False, encoding='utf-8')
-            print(f"Data saved to {filepath}")
-    
-    def generate_album_metadata(self, albums):
-        """Generate metadata for 3D visualization"""
-        metadata = {
-            'extraction_date': datetime.now().isoformat(),
-            'total_albums': len(albums),
-            'albums': []
-        }
-        
-        for i, album in enumerate(albums[:40]):  # Top 40 for 3D visualization
-            album_meta = {
-                'rank': i + 1,
-                'id': album['id'],
-                'name': album['name'],
-                'artist': album['artist'],
-                'release_date': album['release_date'],
-                'total_tracks': album['total_tracks'],
-                'album_type': album['album_type'],
-                'image_url': album['images'][0]['url'] if album['images'] else '',
-                'spotify_url': album['external_url'],
-                'track_count': album['track_count'],
-                'total_popularity': album['total_popularity'],
-                'avg_popularity': album['total_popularity'] / album['track_count'] if album['track_count'] > 0 else 0
-            }
-            metadata['albums'].append(album_meta)
-        
-        return metadata
 
 def main():
+    parser = argparse.ArgumentParser(description="Extract your top albums from Spotify")
+    parser.add_argument('--all-ranges', action='store_true',
+                        help="blend short, medium and long term top tracks into one ranking")
+    args = parser.parse_args()
+    
     print("🎵 Spotify Data Extractor")
     print("=" * 50)
     
@@ -166,8 +210,16 @@ def main():
     extractor = SpotifyDataExtractor()
     
     # Extract data
-    print("📊 Extracting top albums...")
-    top_albums = extractor.get_top_albums(time_range='long_term', limit=50)
+    if args.all_ranges:
+        print("📊 Extracting top albums across all time ranges...")
+        top_albums = extractor.get_blended_top_albums(limit=50)
+    else:
+        print("📊 Extracting top albums...")
+        top_albums = extractor.get_top_albums(time_range='long_term', limit=50)
+    
+    if top_albums is None:
+        print("❌ Failed to fetch top tracks, no files were written.")
+        return
     
     if not top_albums:
         print("❌ No data extracted. Please check your Spotify credentials.")
@@ -175,14 +227,21 @@ def main():
     
     print(f"✅ Extracted {len(top_albums)} albums")
     
-    # Save data in different formats
+    # Save data in different formats, with the 3D visualization metadata,
+    # rendered in one pass and written concurrently
     print("💾 Saving data...")
-    extractor.save_to_json(top_albums, 'spotify_top_albums.json')
-    extractor.save_to_csv(top_albums, 'spotify_top_albums.csv')
-    
-    # Generate metadata for 3D visualization
-    metadata = extractor.generate_album_metadata(top_albums)
-    extractor.save_to_json(metadata, 'spotify_3d_metadata.json')
+    write_album_outputs(top_albums, {
+        'albums': 'spotify_top_albums.json',
+        'csv': 'spotify_top_albums.csv',
+        'metadata': 'spotify_3d_metadata.json'
+    })
+    save_to_parquet(top_albums, 'spotify_top')
+    try:
+        get_default_store().save_playlist(
+            {'id': 'spotify_top_albums', 'name': 'Spotify Top Albums'}, top_albums, kind='top_albums'
+        )
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not update the album store: {e}")
     
     # Display top 10 albums
     print("\n🏆 Top 10 Albums:")
@@ -191,6 +250,10 @@ def main():
         print(f"{i+1:2d}. {album['name']} - {album['artist']}")
     
     print(f"\n✅ Data extraction complete! Check the ../data/ directory for output files.")
+    
+    # Show how well the pooled session reused connections
+    for host, stats in connection_stats().items():
+        print(f"🔌 {host}: {stats['requests']} requests over {stats['connections']} connections")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
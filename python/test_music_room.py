@@ -4,9 +4,9 @@ Test Music Room Integration
 Verifies that all required files are in place for the 3D music room
 """
 
-import json
 import os
 import requests
+from json_io import read_json
 
 def test_music_room_integration():
     """Test that all music room files are properly set up"""
@@ -20,8 +20,7 @@ def test_music_room_integration():
         print("❌ Album mapping file not found")
         return False
     
-    with open(mapping_path, 'r') as f:
-        album_data = json.load(f)
+    album_data = read_json(mapping_path)
     
     print(f"✅ Album mapping loaded: {len(album_data)} albums")
     
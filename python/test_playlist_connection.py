@@ -4,10 +4,9 @@ Test Playlist Connection
 Verifies Spotify API connection and playlist access
 """
 
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
 import os
 from dotenv import load_dotenv
+from spotify_client import get_spotify_client
 
 def test_spotify_connection():
     """Test basic Spotify API connection"""
@@ -33,12 +32,7 @@ def test_spotify_connection():
     
     try:
         # Initialize Spotify client
-        sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-            client_id=client_id,
-            client_secret=client_secret,
-            redirect_uri='http://127.0.0.1:3000/callback',
-            scope='playlist-read-private playlist-read-collaborative'
-        ))
+        sp = get_spotify_client()
         
         # Test API connection
         print("\n🔍 Testing API connection...")
@@ -62,12 +56,7 @@ def test_playlist_access():
     load_dotenv()
     
     try:
-        sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-            client_id=os.getenv('SPOTIFY_CLIENT_ID'),
-            client_secret=os.getenv('SPOTIFY_CLIENT_SECRET'),
-            redirect_uri='http://127.0.0.1:3000/callback',
-            scope='playlist-read-private playlist-read-collaborative'
-        ))
+        sp = get_spotify_client()
         
         # Test with a public playlist (Spotify's "Today's Top Hits")
         test_playlist_id = "37i9dQZF1DXcBWIGoYBM5M"
@@ -99,12 +88,7 @@ def test_user_playlists():
     load_dotenv()
     
     try:
-        sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-            client_id=os.getenv('SPOTIFY_CLIENT_ID'),
-            client_secret=os.getenv('SPOTIFY_CLIENT_SECRET'),
-            redirect_uri='http://127.0.0.1:3000/callback',
-            scope='playlist-read-private playlist-read-collaborative'
-        ))
+        sp = get_spotify_client()
         
         # Get user's playlists
         playlists = sp.current_user_playlists(limit=10)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test Request Scheduler
+Sends a 429 with Retry-After through the real pooled session and checks that
+the scheduler (not urllib3) waits it out and pauses every caller
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import spotipy
+
+from request_scheduler import RequestScheduler
+from spotify_client import create_session
+
+RETRY_AFTER = 2
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Answers the first request with 429 + Retry-After, then 200"""
+
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        if type(self).hits == 1:
+            self.send_response(429)
+            self.send_header('Retry-After', str(RETRY_AFTER))
+            body = b'{"error": {"status": 429, "message": "API rate limit exceeded"}}'
+        else:
+            self.send_response(200)
+            body = b'{"ok": true}'
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_retry_after_pauses_scheduler():
+    """A 429 reaches the scheduler with its header and pauses it for Retry-After seconds"""
+    ThrottlingHandler.hits = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        sp = spotipy.Spotify(auth='test-token', requests_session=create_session())
+        sp.prefix = f'http://127.0.0.1:{server.server_port}/v1/'
+        scheduler = RequestScheduler(base_delay=0.01)
+
+        started = time.monotonic()
+        result = scheduler.call(sp._get, 'ping')
+        elapsed = time.monotonic() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"⏱️  {ThrottlingHandler.hits} requests in {elapsed:.2f}s, stats: {scheduler.stats()}")
+    assert result == {'ok': True}
+    # urllib3 must not have retried the 429 on its own
+    assert ThrottlingHandler.hits == 2
+    assert scheduler.stats()['throttled'] == 1
+    assert RETRY_AFTER <= elapsed < RETRY_AFTER + 1
+
+
+if __name__ == "__main__":
+    test_retry_after_pauses_scheduler()
+    print("✅ Retry-After handled by the scheduler")
@@ -6,8 +6,7 @@ Simple script to test if your Spotify credentials work
 
 import os
 from dotenv import load_dotenv
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
+from spotify_client import get_spotify_client
 
 def test_spotify_connection():
     """Test the Spotify API connection"""
@@ -21,7 +20,6 @@ def test_spotify_connection():
     # Check if credentials are set
     client_id = os.getenv('SPOTIFY_CLIENT_ID')
     client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
-    redirect_uri = os.getenv('SPOTIFY_REDIRECT_URI', 'http://127.0.0.1:3000/callback')
     
     if not client_id or not client_secret:
         print("❌ Spotify credentials not found!")
@@ -38,12 +36,7 @@ def test_spotify_connection():
     try:
         # Initialize Spotify client
         print("🔗 Connecting to Spotify...")
-        sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-            client_id=client_id,
-            client_secret=client_secret,
-            redirect_uri=redirect_uri,
-            scope='user-top-read user-read-recently-played'
-        ))
+        sp = get_spotify_client()
         
         # Test connection by getting user info
         print("👤 Getting user information...")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Track Schema
+Single declaration of the Spotify fields the album aggregation consumes.
+The playlist `fields=` projection is derived from it, so the extractor only
+downloads what the aggregator actually reads.
+"""
+
+# Output key -> dotted path into the Spotify album object.
+# A numeric path part selects a list element (it is dropped in the projection)
+ALBUM_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'artist': 'artists.0.name',
+    'artist_id': 'artists.0.id',
+    'release_date': 'release_date',
+    'total_tracks': 'total_tracks',
+    'album_type': 'album_type',
+    'images': 'images',
+    'external_url': 'external_urls.spotify',
+}
+
+# Output key -> dotted path into the Spotify track object
+TRACK_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'popularity': 'popularity',
+    'duration_ms': 'duration_ms',
+}
+
+# Spotify's top-items time ranges, shortest first (ranks and scores are kept per range)
+TIME_RANGES = ('short_term', 'medium_term', 'long_term')
+
+# Fields read from the playlist item wrapping each track
+PLAYLIST_ITEM_FIELDS = ('added_at',)
+
+# Fields read from the playlist object by get_playlist_info
+PLAYLIST_INFO_FIELDS = (
+    'name',
+    'description',
+    'owner.display_name',
+    'tracks.total',
+    'external_urls.spotify',
+    'snapshot_id',
+)
+
+
+def get_path(obj, path):
+    """Follow a dotted path through nested dicts/lists (None if missing)"""
+    for part in path.split('.'):
+        if obj is None:
+            return None
+        if part.isdigit():
+            index = int(part)
+            obj = obj[index] if len(obj) > index else None
+        else:
+            obj = obj.get(part)
+    return obj
+
+
+def project(obj, fields):
+    """Build a flat record from a Spotify object using a field declaration"""
+    return {key: get_path(obj, path) for key, path in fields.items()}
+
+
+def _build_tree(paths, tree=None):
+    tree = {} if tree is None else tree
+    for path in paths:
+        node = tree
+        for part in path.split('.'):
+            if part.isdigit():
+                continue
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _render(tree):
+    parts = []
+    for key, children in tree.items():
+        parts.append(f"{key}({_render(children)})" if children else key)
+    return ','.join(parts)
+
+
+def fields_projection(paths):
+    """Render dotted paths as a Spotify `fields=` filter string,
+    e.g. ['owner.display_name', 'tracks.total'] -> 'owner(display_name),tracks(total)'
+    """
+    return _render(_build_tree(paths))
+
+
+def _playlist_item_paths():
+    paths = list(PLAYLIST_ITEM_FIELDS)
+    paths += [f'track.{path}' for path in TRACK_FIELDS.values()]
+    paths += [f'track.album.{path}' for path in ALBUM_FIELDS.values()]
+    return paths
+
+
+# Projections used by the extractors
+PLAYLIST_TRACKS_PROJECTION = f"total,items({fields_projection(_playlist_item_paths())})"
+PLAYLIST_ENTRIES_PROJECTION = f"total,items({fields_projection(['added_at', 'track.id'])})"
+PLAYLIST_INFO_PROJECTION = fields_projection(PLAYLIST_INFO_FIELDS)
@@ -1,18 +1,26 @@
 import os
-import json
+import sys
 import difflib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+from cover_store import CoverStore
+from json_io import read_json, write_json
+
 # Paths
 ALBUMS_DIR = os.path.join('public', 'albums')
 JSON_PATH = os.path.join('data', 'ROOM_playlist_album_image_mapping_with_metadata.json')
 OUTPUT_PATH = os.path.join('data', 'ROOM_playlist_album_image_mapping_with_metadata_fixed.json')
+MANIFEST_PATH = os.path.join('data', 'cache', 'cover_manifest.json')
+
+# Covers in the content-addressed store, looked up by their Spotify image URL
+store = CoverStore(ALBUMS_DIR, MANIFEST_PATH)
+stored_files = {entry['file'] for entry in store.entries.values()}
 
-# Load album image files
-album_files = [f for f in os.listdir(ALBUMS_DIR) if f.lower().endswith('.jpg')]
+# Load album image files still named after the album (older downloads)
+album_files = [f for f in os.listdir(ALBUMS_DIR) if f.lower().endswith('.jpg') and f not in stored_files]
 
 # Load JSON
-with open(JSON_PATH, 'r') as f:
-    albums_json = json.load(f)
+albums_json = read_json(JSON_PATH)
 
 # Helper to create a search key from album/artist name
 
@@ -30,6 +38,11 @@ file_keys = {make_file_key(f): f for f in album_files}
 # Update JSON
 num_matched = 0
 for album in albums_json:
+    local_image = store.local_image(album.get('spotify_image_url'))
+    if local_image:
+        album['local_image'] = local_image
+        num_matched += 1
+        continue
     key = make_key(album)
     # Find best match
     best_match = difflib.get_close_matches(key, file_keys.keys(), n=1, cutoff=0.6)
@@ -41,7 +54,6 @@ for album in albums_json:
         print(f"No match for: {album['artist']} - {album['name']}")
 
 # Save updated JSON
-with open(OUTPUT_PATH, 'w') as f:
-    json.dump(albums_json, f, indent=2)
+write_json(OUTPUT_PATH, albums_json)
 
 print(f"Updated {num_matched} album image paths. Output written to {OUTPUT_PATH}") 
\ No newline at end of file
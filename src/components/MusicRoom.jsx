@@ -9,7 +9,7 @@ const Album = ({ album, position, isRecommended, onClick, isSelected }) => {
   const [hovered, setHovered] = useState(false)
   
   // Load album texture
-  const texture = useTexture(album.imageUrl)
+  const texture = useTexture(album.textureUrl || album.imageUrl)
   
   useFrame((state) => {
     if (meshRef.current) {
@@ -1,5 +1,59 @@
 import { useState, useEffect } from 'react'
 
+// Expand the dictionary-encoded bundle written by python/build_album_bundle.py
+function decodeAlbumBundle(bundle) {
+  return bundle.rows.map(row => {
+    const album = {}
+    bundle.fields.forEach((field, i) => {
+      let value = row[i]
+      if (value === null) return
+      const table = bundle.tables[field]
+      if (table) {
+        value = Array.isArray(value) ? value.map(index => table[index]) : table[value]
+      } else if (bundle.prefixes[field]) {
+        value = bundle.prefixes[field] + value
+      }
+      album[field] = value
+    })
+    return album
+  })
+}
+
+// Prefer the compact content-hashed bundle; fall back to the full JSON file
+async function fetchAlbumData() {
+  try {
+    const manifestResponse = await fetch('/data/album_bundle.manifest.json', { cache: 'no-cache' })
+    if (manifestResponse.ok) {
+      const manifest = await manifestResponse.json()
+      const bundleResponse = await fetch(`/data/${manifest.bundle}`)
+      if (bundleResponse.ok) {
+        return decodeAlbumBundle(await bundleResponse.json())
+      }
+    }
+  } catch (err) {
+    console.warn('Album bundle unavailable, loading full album data:', err)
+  }
+
+  const response = await fetch('/data/ROOM_playlist_album_image_mapping_with_metadata.json')
+  if (!response.ok) {
+    throw new Error('Failed to load album data')
+  }
+  return response.json()
+}
+
+// Size and format preference for the room's cover textures
+const TEXTURE_SIZES = ['256', '128', '512', '64']
+const TEXTURE_FORMAT = 'webp'
+// public/albums (and its lod/ textures) is not deployed; set VITE_LOCAL_TEXTURES=true
+// when serving the covers built by python/build_cover_textures.py
+const LOCAL_TEXTURES = import.meta.env.VITE_LOCAL_TEXTURES === 'true'
+
+function pickTexture(textures) {
+  if (!LOCAL_TEXTURES || !textures) return null
+  const size = TEXTURE_SIZES.find(size => textures[size])
+  return size ? textures[size][TEXTURE_FORMAT] || textures[size].jpeg : null
+}
+
 export function useAlbumData() {
   const [albums, setAlbums] = useState([])
   const [loading, setLoading] = useState(true)
@@ -11,12 +65,7 @@ export function useAlbumData() {
         setLoading(true)
         
         // Load the album data with metadata
-        const response = await fetch('/data/ROOM_playlist_album_image_mapping_with_metadata.json')
-        if (!response.ok) {
-          throw new Error('Failed to load album data')
-        }
-        
-        const albumData = await response.json()
+        const albumData = await fetchAlbumData()
         
         // Transform the data for easier use
         const transformedAlbums = albumData.map(album => ({
@@ -24,6 +73,10 @@ export function useAlbumData() {
           id: album.rank,
           // Use Spotify image URL instead of local image path for deployment compatibility
           imageUrl: album.spotify_image_url || album.local_image,
+          // The room never shows covers near full size: prefer a local texture,
+          // then Spotify's 300px cover
+          textureUrl: pickTexture(album.textures) || album.spotify_small_image_url ||
+            album.spotify_image_url || album.local_image,
           spotifyUrl: album.spotify_url,
           popularity: album.avg_popularity,
           // Ensure arrays exist